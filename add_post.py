@@ -98,6 +98,9 @@ def add_post_interactive():
             author=author
         )
         
+        post.update_searchable_text()
+        post.update_render_artifacts()
+        
         # Add categories
         post.categories = categories
         
@@ -156,6 +159,8 @@ def add_post_from_file(title, content_file, author='Admin', categories=None, pub
             author=author
         )
         
+        post.update_searchable_text()
+        post.update_render_artifacts()
         post.categories = category_objects
         
         try:
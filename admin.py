@@ -8,6 +8,7 @@ from datetime import datetime
 import re
 from utils import process_blog_content
 from auth import login_required
+from post_events import notify_post_change
 
 
 def create_slug(text):
@@ -36,7 +37,7 @@ def register_admin_routes(app, db, Post, Category):
     def admin_posts():
         """Redirect to SEO posts list"""
         try:
-            return redirect(url_for('admin_seo_posts'))
+            return redirect(url_for('admin_seo_posts', **request.args))  # Keep sort and filters
         except:
             return redirect('/')
     
@@ -100,6 +101,8 @@ def register_admin_routes(app, db, Post, Category):
             )
             
             post.categories = categories
+            post.update_searchable_text()
+            post.update_render_artifacts()
             
             try:
                 db.session.add(post)
@@ -149,6 +152,8 @@ def register_admin_routes(app, db, Post, Category):
             
             # Process content
             post.content = process_blog_content(post.content)
+            post.update_searchable_text()
+            post.update_render_artifacts()
             
             # Parse date
             if published_date_str:
@@ -183,7 +188,7 @@ def register_admin_routes(app, db, Post, Category):
         
         # GET request - show form
         categories = Category.query.all()
-        post_categories = post.categories.all()
+        post_categories = list(post.categories)
         today_date = datetime.now().strftime('%Y-%m-%d')
         return render_template('admin/edit_post.html', post=post, categories=categories, post_categories=post_categories, today_date=today_date)
     
@@ -193,10 +198,12 @@ def register_admin_routes(app, db, Post, Category):
         """Delete a post"""
         post = Post.query.get_or_404(post_id)
         title = post.title
+        category_slugs = [category.slug for category in post.categories]
         
         try:
             db.session.delete(post)
             db.session.commit()
+            notify_post_change(post_id, previous_categories=category_slugs)
             flash(f'Post "{title}" deleted successfully!', 'success')
         except Exception as e:
             flash(f'Error deleting post: {str(e)}', 'error')
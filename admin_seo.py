@@ -2,7 +2,7 @@
 SEO-Optimized Admin Panel for Blog Posts
 """
 from flask import render_template, request, redirect, url_for, flash, jsonify, Response, session
-from datetime import datetime
+from datetime import datetime, timedelta
 import os
 import re
 import json
@@ -16,6 +16,7 @@ from seo_utils import (
 )
 from flask import url_for
 from auth import login_required
+from post_events import notify_post_change
 
 # SEO models - will be defined inside register_seo_admin_routes to avoid circular imports
 PostSEO = None
@@ -48,6 +49,8 @@ def register_seo_admin_routes(app, db, Post, Category):
         class _PostSEO(db.Model):
             """SEO metadata for blog posts"""
             __tablename__ = 'post_seo'
+            # Admin post list sorted or filtered by score (weakest posts first)
+            __table_args__ = (db.Index('ix_post_seo_seo_score', 'seo_score', 'post_id'),)
             id = db.Column(db.Integer, primary_key=True)
             post_id = db.Column(db.Integer, db.ForeignKey('post.id'), unique=True, nullable=False)
             primary_keyword = db.Column(db.String(200))
@@ -73,7 +76,7 @@ def register_seo_admin_routes(app, db, Post, Category):
             """Images with ALT text for posts"""
             __tablename__ = 'post_images'
             id = db.Column(db.Integer, primary_key=True)
-            post_id = db.Column(db.Integer, db.ForeignKey('post.id'), nullable=False)
+            post_id = db.Column(db.Integer, db.ForeignKey('post.id'), nullable=False, index=True)
             image_url = db.Column(db.String(500), nullable=False)
             alt_text = db.Column(db.String(200), nullable=False)
             caption = db.Column(db.Text)
@@ -132,7 +135,7 @@ def register_seo_admin_routes(app, db, Post, Category):
             except:
                 pass
         
-        recent_posts = Post.query.order_by(Post.created_at.desc()).limit(10).all()
+        recent_posts = Post.query.options(*Post.without_bodies()).order_by(Post.created_at.desc()).limit(10).all()
         
         return render_template('admin/seo_dashboard.html',
                              total_posts=total_posts,
@@ -245,6 +248,8 @@ def register_seo_admin_routes(app, db, Post, Category):
                 author=author,
                 status=status
             )
+            post.update_searchable_text()
+            post.update_render_artifacts()
             
             # Handle categories
             categories_list = []
@@ -292,6 +297,7 @@ def register_seo_admin_routes(app, db, Post, Category):
                     seo_score = None
                 
                 db.session.commit()
+                notify_post_change(post.id, post)
                 
                 # Show warnings if any
                 for warning in seo_warnings:
@@ -431,7 +437,7 @@ def register_seo_admin_routes(app, db, Post, Category):
             if not title or not content:
                 flash('Title and content are required!', 'error')
                 categories = Category.query.all()
-                post_categories = post.categories.all()
+                post_categories = list(post.categories)
                 today_date = datetime.now().strftime('%Y-%m-%d')
                 return render_template('admin/seo_edit_post.html',
                                      post=post,
@@ -452,7 +458,7 @@ def register_seo_admin_routes(app, db, Post, Category):
                     if existing and existing.id != post.id:
                         flash(f'A post with slug "{new_slug}" already exists!', 'error')
                         categories = Category.query.all()
-                        post_categories = post.categories.all()
+                        post_categories = list(post.categories)
                         today_date = datetime.now().strftime('%Y-%m-%d')
                         return render_template('admin/seo_edit_post.html',
                                              post=post,
@@ -464,12 +470,18 @@ def register_seo_admin_routes(app, db, Post, Category):
                     post.slug = new_slug
             
             # Update post
+            # Date ordered listings only need a refresh if one of these changes
+            listing_position = (post.status, post.published_date)
+            category_slugs = [category.slug for category in post.categories]
+            
             post.title = title
             post.content = process_blog_content(content)
+            post.update_searchable_text()
             post.excerpt = excerpt
             post.author = author
             post.featured_image = featured_image
             post.youtube_video_url = request.form.get('youtube_video_url', '').strip()
+            post.update_render_artifacts()
             post.status = status
             post.updated_at = datetime.now()
             
@@ -554,6 +566,8 @@ def register_seo_admin_routes(app, db, Post, Category):
                     seo_score = None
                 
                 db.session.commit()
+                notify_post_change(post.id, post, reordered=(post.status, post.published_date) != listing_position,
+                                   previous_categories=category_slugs)
                 
                 # Show warnings if any
                 for warning in seo_warnings:
@@ -565,7 +579,7 @@ def register_seo_admin_routes(app, db, Post, Category):
                 flash(f'Error updating post: {str(e)}', 'error')
                 db.session.rollback()
                 categories = Category.query.all()
-                post_categories = post.categories.all()
+                post_categories = list(post.categories)
                 today_date = datetime.now().strftime('%Y-%m-%d')
                 return render_template('admin/seo_edit_post.html',
                                      post=post,
@@ -577,7 +591,7 @@ def register_seo_admin_routes(app, db, Post, Category):
         
         # GET request - show form
         categories = Category.query.all()
-        post_categories = post.categories.all()
+        post_categories = list(post.categories)
         today_date = datetime.now().strftime('%Y-%m-%d')
         
         # Get existing SEO data
@@ -652,29 +666,84 @@ def register_seo_admin_routes(app, db, Post, Category):
                              form_data=form_data,
                              seo_data=seo_data)
     
+    # Sort orders of the post list - each one an index scan (see migrate_indexes.py)
+    admin_post_sorts = {
+        'newest': lambda: (Post.published_date.desc(), Post.id.desc()),
+        'oldest': lambda: (Post.published_date.asc(), Post.id.asc()),
+        'updated': lambda: (Post.updated_at.desc(), Post.id.desc()),
+        'score': lambda: (PostSEO.seo_score.asc(), PostSEO.post_id.asc()),  # Weakest first
+        'score_desc': lambda: (PostSEO.seo_score.desc(), PostSEO.post_id.desc()),
+    }
+    
+    def parse_date_arg(name):
+        try:
+            return datetime.strptime(request.args.get(name, ''), '%Y-%m-%d')
+        except ValueError:
+            return None
+    
     @app.route('/admin/posts')
     @app.route('/admin/seo/posts')
     @login_required
     def admin_seo_posts():
-        """List all posts with SEO scores"""
+        """List all posts with SEO scores, sorted and filtered in the database"""
         page = request.args.get('page', 1, type=int)
-        per_page = 20
+        per_page = max(1, min(request.args.get('per_page', 20, type=int), 100))
+        sort = request.args.get('sort', 'newest')
+        if sort not in admin_post_sorts:
+            sort = 'newest'
+        status = request.args.get('status', '')
+        category = request.args.get('category', '')
+        min_score = request.args.get('min_score', type=int)
+        max_score = request.args.get('max_score', type=int)
+        date_from = parse_date_arg('from')
+        date_to = parse_date_arg('to')
+        missing_seo = request.args.get('seo') == 'missing'
+        # Non-empty filters, kept on the pagination links
+        filters = {
+            name: value for name, value in request.args.items()
+            if name != 'page' and value
+        }
         
-        posts = Post.query.order_by(Post.published_date.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+        # Posts and their SEO rows in one query. Sorting or filtering by score only
+        # considers scored posts, so the join can start from the seo_score index
+        scored_only = sort.startswith('score') or min_score is not None or max_score is not None
+        query = Post.query.options(*Post.without_bodies()).add_columns(PostSEO.seo_score)
+        if scored_only and not missing_seo:
+            query = query.join(PostSEO, PostSEO.post_id == Post.id)
+        else:
+            query = query.outerjoin(PostSEO, PostSEO.post_id == Post.id)
+            if missing_seo:
+                query = query.filter(PostSEO.id.is_(None))
+        if status:
+            query = query.filter(Post.status == status)
+        if category:
+            query = query.join(Post.categories).filter(Category.slug == category)
+        if min_score is not None:
+            query = query.filter(PostSEO.seo_score >= min_score)
+        if max_score is not None:
+            query = query.filter(PostSEO.seo_score <= max_score)
+        if date_from:
+            query = query.filter(Post.published_date >= date_from)
+        if date_to:
+            query = query.filter(Post.published_date < date_to + timedelta(days=1))
         
-        # Get SEO scores
-        seo_scores = {}
         try:
-            for post in posts.items:
-                seo = PostSEO.query.filter_by(post_id=post.id).first()
-                if seo:
-                    seo_scores[post.id] = seo.seo_score
-        except:
-            pass  # Table doesn't exist yet
+            posts = query.order_by(*admin_post_sorts[sort]()).paginate(
+                page=page, per_page=per_page, error_out=False
+            )
+            seo_scores = {post.id: score for post, score in posts.items if score is not None}
+            posts.items = [post for post, _ in posts.items]
+        except Exception:
+            # post_seo does not exist yet - list the posts without scores
+            db.session.rollback()
+            posts = Post.query.options(*Post.without_bodies()).order_by(Post.published_date.desc()).paginate(
+                page=page, per_page=per_page, error_out=False
+            )
+            seo_scores = {}
         
-        return render_template('admin/seo_posts.html', posts=posts, seo_scores=seo_scores)
+        categories = Category.query.order_by(Category.name).all()
+        return render_template('admin/seo_posts.html', posts=posts, seo_scores=seo_scores,
+                             categories=categories, filters=filters, sort=sort)
     
     @app.route('/admin/seo/posts/<int:post_id>/toggle-status', methods=['POST'])
     @login_required
@@ -695,6 +764,7 @@ def register_seo_admin_routes(app, db, Post, Category):
             
             post.updated_at = datetime.now()
             db.session.commit()
+            notify_post_change(post.id, post)
         except Exception as e:
             flash(f'Error updating post status: {str(e)}', 'error')
             db.session.rollback()
@@ -707,6 +777,7 @@ def register_seo_admin_routes(app, db, Post, Category):
         """Delete a post and its related SEO data"""
         post = Post.query.get_or_404(post_id)
         title = post.title
+        category_slugs = [category.slug for category in post.categories]
         
         try:
             # IMPORTANT: Delete child records FIRST to avoid foreign key constraint errors
@@ -798,6 +869,7 @@ def register_seo_admin_routes(app, db, Post, Category):
             # 5. Now delete the post (parent record) - all child records should be gone
             db.session.delete(post)
             db.session.commit()
+            notify_post_change(post_id, previous_categories=category_slugs)
             flash(f'Post "{title}" deleted successfully!', 'success')
         except Exception as e:
             flash(f'Error deleting post: {str(e)}', 'error')
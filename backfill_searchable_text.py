@@ -0,0 +1,70 @@
+"""
+Backfill Post.searchable_text and the render artifacts (rendered_content, plain_excerpt,
+first_image, schema_description) for posts saved before those columns existed
+Run: python backfill_searchable_text.py          (only posts missing any of them, or whose
+                                                  searchable_text still holds &amp; style references)
+     python backfill_searchable_text.py --all    (recompute every post)
+
+Add the column first with: python migrate_seo.py
+
+Rows are written with a plain UPDATE that keeps updated_at as it is - the derived
+columns are not an edit, and updated_at is the sitemap lastmod and the content
+version of the conditional GET validators.
+"""
+import sys
+from sqlalchemy import bindparam
+from app import app, db, Post
+from utils import extract_searchable_content, build_render_artifacts
+
+BATCH_SIZE = 200
+
+
+def backfill_searchable_text(recompute_all=False):
+    """Compute the derived fields in batches so large catalogs don't load every body at once"""
+    with app.app_context():
+        query = Post.query
+        if not recompute_all:
+            query = query.filter(db.or_(
+                Post.searchable_text.is_(None), Post.rendered_content.is_(None),
+                # Computed before character references were decoded
+                Post.searchable_text.like('%&%;%'),
+            ))
+        
+        total = query.count()
+        print(f"Found {total} posts to backfill...")
+        
+        # updated_at set to itself so its onupdate default doesn't stamp every post with today
+        table = Post.__table__
+        fields = ['searchable_text', 'rendered_content', 'plain_excerpt', 'first_image', 'schema_description']
+        statement = table.update().where(table.c.id == bindparam('b_id')).values(
+            updated_at=table.c.updated_at, **{field: bindparam('b_' + field) for field in fields}
+        )
+        rows = query.with_entities(Post.id, Post.content, Post.youtube_video_url)
+        
+        updated = 0
+        last_id = 0
+        while True:
+            batch = rows.filter(Post.id > last_id).order_by(Post.id).limit(BATCH_SIZE).all()
+            if not batch:
+                break
+            values = []
+            for post_id, content, youtube_video_url in batch:
+                derived = build_render_artifacts(content, youtube_video_url)
+                derived['searchable_text'] = extract_searchable_content(content)
+                values.append({'b_id': post_id, **{'b_' + field: derived[field] for field in fields}})
+            last_id = batch[-1].id
+            try:
+                db.session.execute(statement, values)
+                db.session.commit()
+                updated += len(batch)
+                print(f"Updated {updated}/{total}")
+            except Exception as e:
+                print(f"Error saving batch ending at post {last_id}: {e}")
+                db.session.rollback()
+        
+        print("\nBackfill complete!")
+        print(f"Updated: {updated} posts")
+
+
+if __name__ == '__main__':
+    backfill_searchable_text(recompute_all='--all' in sys.argv)
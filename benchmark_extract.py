@@ -0,0 +1,170 @@
+"""
+Equivalence check and micro-benchmark for utils.extract_searchable_content
+
+Compares the single-pass scanner against the previous regex implementation
+(kept below as legacy_extract_searchable_content) on synthetic posts, hand
+written edge cases and randomly assembled markup, then times both on large posts.
+
+Run: python benchmark_extract.py
+     python benchmark_extract.py --cases 50000 --sizes 10 200    (the old code takes seconds past ~100 sections)
+"""
+import argparse
+import html
+import random
+import re
+import sys
+import time
+
+from utils import extract_searchable_content
+from benchmark_search import synthetic_post
+
+
+def legacy_extract_searchable_content(content):
+    """The regex implementation extract_searchable_content replaced, kept as reference"""
+    if not content:
+        return ""
+
+    faq_patterns = [
+        r'(<h[2-6][^>]*>.*?[Ff][Aa][Qq].*?</h[2-6]>).*$',
+        r'(<h[2-6][^>]*>.*?[Ff]requently\s+[Aa]sked.*?</h[2-6]>).*$',
+        r'(<h[2-6][^>]*>.*?[Qq]uestions?\s+[Aa]nd\s+[Aa]nswers?.*?</h[2-6]>).*$',
+    ]
+
+    cleaned_content = content
+    for pattern in faq_patterns:
+        match = re.search(pattern, cleaned_content, re.IGNORECASE | re.DOTALL)
+        if match:
+            cleaned_content = cleaned_content[:match.start()]
+            break
+
+    internal_link_patterns = [
+        r'<h[2-6][^>]*>.*?[Ii]nternal\s+[Ll]inking.*?</h[2-6]>.*$',
+        r'<h[2-6][^>]*>.*?[Ii]nternal\s+[Ll]ink.*?</h[2-6]>.*$',
+        r'<h[2-6][^>]*>.*?[Rr]elated\s+[Aa]rticles.*?</h[2-6]>.*$',
+        r'<h[2-6][^>]*>.*?[Ss]ee\s+[Aa]lso.*?</h[2-6]>.*$',
+        r'[Ii]nternal\s+[Ll]inking\s+[Ss]uggestions.*$',
+        r'[Ii]nternal\s+[Ll]ink\s+[Ss]uggestions.*$',
+    ]
+
+    for pattern in internal_link_patterns:
+        match = re.search(pattern, cleaned_content, re.IGNORECASE | re.DOTALL)
+        if match:
+            cleaned_content = cleaned_content[:match.start()]
+            break
+
+    text = re.sub(r'<[^>]+>', ' ', cleaned_content)
+
+    text_patterns_to_remove = [
+        r'Anchor\s+texts?.*$',
+        r'Target\s+slug.*$',
+        r'Related\s+articles?.*$',
+        r'See\s+also.*$',
+    ]
+
+    for pattern in text_patterns_to_remove:
+        text = re.sub(pattern, '', text, flags=re.IGNORECASE | re.DOTALL)
+
+    text = re.sub(r'\s+', ' ', text).strip()
+
+    return text
+
+
+EDGE_CASES = [
+    '',
+    'plain text without any markup',
+    '<p>Intro</p><h2>Setup</h2><p>body</p><h2>FAQ</h2><p>answers</p>',
+    '<p>Intro</p><h2>Setup</h2><p>mentions faq but no heading closes after it</p>',
+    '<p>Intro</p><H3 class="x">Frequently   Asked Questions</H3><p>a</p>',
+    '<p>Intro</p><h4>Question and Answers</h4>',
+    '<p>Intro</p><h2>Steps</h2><p>x</p><h2>Internal Linking</h2><ul><li>a</li></ul>',
+    '<p>Intro</p><h2>Related Articles</h2><p>x</p>',
+    '<p>Intro with See also text</p><h2>More</h2><p>Anchor texts: a, b</p>',
+    '<p>Internal link suggestions first</p><p>Internal Linking Suggestions second</p>',
+    '<h2>FAQ</h2><p>Internal linking suggestions</p>',
+    '<p>Internal linking suggestions before</p><h2>FAQ</h2>',
+    '<p>keep</p><h2',
+    '<p>a <> b < c</p><h2 <p>FAQ</p></h2>',
+    '<p>x</p><h7>FAQ</h7><h1>FAQ</h1>',
+    '<p>Target\nslug /post/x</p>',
+    '<p>non breaking separators\x1c</p>',
+    '<p>Long s: ſee also</p><h2>K: Keep</h2>',
+]
+
+FRAGMENTS = [
+    '<h2>', '<H3 class="faq">', '<h5 id=x>', '</h2>', '</H4>', '<h2', '<p>', '</p>', '<>', '<', '>',
+    'FAQ', 'fAq', 'Frequently  Asked', 'frequently\nasked', 'questions and answers', 'Question and Answer',
+    'Internal Linking', 'internal link', 'Internal linking suggestions', 'internal  link suggestions',
+    'Related Articles', 'related article', 'See also', 'see\talso', 'Anchor texts', 'anchor text',
+    'Target slug', ' ', '\n', ' ', 'word ', 'python ', 'lambda', 'ſ', 'é',
+]
+
+
+def random_markup(rng):
+    return ''.join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 40)))
+
+
+def check_equivalence(cases, seed=1):
+    """Compare both implementations, print the first mismatches and return their count"""
+    rng = random.Random(seed)
+    inputs = list(EDGE_CASES)
+    inputs += [synthetic_post(rng, number)[2] for number in range(200)]
+    inputs += [random_markup(rng) for _ in range(cases)]
+
+    mismatches = 0
+    for content in inputs:
+        # The scanner also decodes character references, which the regexes did not
+        expected = ' '.join(html.unescape(legacy_extract_searchable_content(content)).split())
+        actual = extract_searchable_content(content)
+        if actual != expected:
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"❌ Mismatch for {content[:120]!r}\n   expected {expected[:120]!r}\n   actual   {actual[:120]!r}")
+    if mismatches:
+        print(f"❌ {mismatches}/{len(inputs)} inputs differ")
+    else:
+        print(f"✅ Identical output on {len(inputs)} inputs")
+    return mismatches
+
+
+def large_post(rng, sections, with_faq=True):
+    """A post with the given number of H2 sections, optionally without FAQ tail (the slow path for the old regexes)"""
+    body = [synthetic_post(rng, number)[2] for number in range(max(1, sections // 6))]
+    content = '\n'.join(body)
+    if not with_faq:
+        content = re.sub(r'<h2>(Frequently Asked Questions|Internal Linking Suggestions)</h2>', '<h2>Notes</h2>', content)
+    return content
+
+
+def time_call(function, content, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function(content)
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def run_benchmark(sizes, repeat):
+    rng = random.Random(2)
+    print(f"\n{'post':<28}{'size':>10}{'legacy':>12}{'scanner':>12}{'speedup':>10}")
+    for sections in sizes:
+        for with_faq in (True, False):
+            content = large_post(rng, sections, with_faq)
+            legacy = time_call(legacy_extract_searchable_content, content, repeat)
+            scanner = time_call(extract_searchable_content, content, repeat)
+            label = f"{sections} sections{'' if with_faq else ', no FAQ'}"
+            print(f"{label:<28}{len(content) // 1024:>8}KB{legacy:>10.2f}ms{scanner:>10.2f}ms{legacy / scanner:>9.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check and time extract_searchable_content')
+    parser.add_argument('--cases', type=int, default=20000, help='Random markup inputs to compare')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 50, 100], help='H2 sections per large post')
+    parser.add_argument('--repeat', type=int, default=20, help='Calls per timing')
+    args = parser.parse_args()
+
+    mismatches = check_equivalence(args.cases)
+    run_benchmark(args.sizes, args.repeat)
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+Listing query benchmark - bytes fetched and memory held with and without the
+post bodies deferred (Post.without_bodies)
+
+Run: python benchmark_listing.py                  (10k synthetic posts, see benchmark_search.py)
+     python benchmark_listing.py --posts 50000
+
+Each list query shape runs twice on the same database: loading every column, as
+the list pages used to, and with the body columns deferred so cards are built
+from the preview columns. Transfer is the size of the column values the database
+returns; memory is the tracemalloc peak while the rows are turned into Post objects.
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+from benchmark_search import DEFAULT_DB, seed
+
+
+def value_size(value):
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    return 8  # Integers, booleans and datetimes - small next to the text columns
+
+
+def measure(db, query):
+    """(rows, bytes returned, peak bytes allocated, ms) of loading query as ORM objects"""
+    # Plain rows of the same SELECT, deferred columns left out
+    transfer = sum(value_size(value) for row in db.session.connection().execute(query.statement) for value in row)
+    db.session.expunge_all()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    posts = query.all()
+    elapsed = (time.perf_counter() - start) * 1000
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    rows = len(posts)
+    del posts
+    db.session.expunge_all()
+    return rows, transfer, peak, elapsed
+
+
+def human(size):
+    if size >= 1024 * 1024:
+        return f'{size / 1024 / 1024:.1f}MB'
+    return f'{size / 1024:.1f}KB'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure what deferring the post bodies saves on list queries')
+    parser.add_argument('--posts', type=int, default=10000, help='Synthetic posts to seed')
+    parser.add_argument('--db', default=DEFAULT_DB, help='SQLite file used for the benchmark database')
+    parser.add_argument('--reseed', action='store_true', help='Reseed even if the database already has --posts posts')
+    args = parser.parse_args()
+
+    # app reads its configuration at import time
+    os.makedirs(os.path.dirname(os.path.abspath(args.db)), exist_ok=True)
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.abspath(args.db)
+    from app import app, db, Post, Category, post_categories
+
+    with app.app_context():
+        db.create_all()
+        existing = Post.query.count()
+        # Databases seeded before the render artifacts were stored have no preview columns
+        missing_previews = Post.query.filter(Post.plain_excerpt.is_(None)).count()
+    if args.reseed or existing != args.posts or missing_previews:
+        seed(app, db, Post, Category, post_categories, args.posts)
+
+    # (label, query) - the list query shapes of the public and admin pages
+    published = lambda: Post.query.filter_by(status='published').order_by(Post.published_date.desc())
+    scenarios = [
+        ('Home page (10 posts)', lambda: Post.query.order_by(Post.published_date.desc()).limit(10)),
+        ('Search browse (10 posts)', lambda: published().limit(10)),
+        ('Admin post list (20 posts)', lambda: Post.query.order_by(Post.published_date.desc()).limit(20)),
+        ('Admin dashboard (10 posts)', lambda: Post.query.order_by(Post.created_at.desc()).limit(10)),
+        ('Every published post', published),
+    ]
+
+    print(f"\nPosts: {args.posts}\n")
+    print(f"{'Query':<28} {'rows':>6}  {'transfer full':>14} {'deferred':>10}  {'memory full':>12} {'deferred':>10}  {'time full':>10} {'deferred':>9}")
+    total_full = total_deferred = 0
+    with app.app_context():
+        for label, make_query in scenarios:
+            rows, full_bytes, full_peak, full_ms = measure(db, make_query())
+            _, lean_bytes, lean_peak, lean_ms = measure(db, make_query().options(*Post.without_bodies()))
+            total_full += full_bytes
+            total_deferred += lean_bytes
+            print(f"{label:<28} {rows:>6}  {human(full_bytes):>14} {human(lean_bytes):>10}  "
+                  f"{human(full_peak):>12} {human(lean_peak):>10}  {full_ms:8.1f}ms {lean_ms:7.1f}ms")
+
+        # The cards still get their excerpt and image without touching a deferred column
+        post = published().options(*Post.without_bodies()).first()
+        post.preview()
+        unloaded = db.inspect(post).unloaded
+        untouched = all(name in unloaded for name in Post.BODY_COLUMNS)
+
+    print(f"\n{'✅' if untouched else '❌'} preview() leaves the body columns unloaded")
+    print(f"✅ Deferred queries return {100 - 100 * total_deferred / max(1, total_full):.1f}% fewer bytes")
+    return 0 if untouched else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,240 @@
+"""
+Search benchmark - seeds a SQLite database with synthetic posts and times the
+search routes through the Flask test client
+
+Run: python benchmark_search.py --posts 10000
+     python benchmark_search.py --posts 100000 --requests 500 --backend database
+     SEARCH_CACHE_SIZE=0 python benchmark_search.py    (measure without the result cache)
+
+Posts are shaped like AI-generated ones (intro, H2/H3 sections, lists, code, a
+FAQ block and an "Internal Linking" tail) so extract_searchable_content does
+the same work it does on real content. The database is kept between runs and
+only reseeded when --posts changes (or with --reseed).
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from urllib.parse import quote_plus
+
+DEFAULT_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'benchmark.db')
+SEED_BATCH = 1000
+
+TOPICS = [
+    'python', 'aws', 'lambda', 'docker', 'kubernetes', 'terraform', 'django', 'flask',
+    'react', 'javascript', 'typescript', 'postgres', 'mysql', 'redis', 'kafka', 'spark',
+    'pandas', 'numpy', 'pytorch', 'tensorflow', 'linux', 'nginx', 'graphql', 'rust',
+    'golang', 'java', 'spring', 'azure', 'gcp', 'serverless', 'microservices', 'devops',
+]
+ACTIONS = [
+    'deploy', 'configure', 'optimize', 'debug', 'secure', 'scale', 'monitor', 'test',
+    'migrate', 'automate', 'install', 'profile', 'cache', 'index', 'containerize', 'refactor',
+]
+WORDS = (
+    'application service request response performance latency throughput memory cluster '
+    'instance container pipeline function endpoint database query table schema migration '
+    'deployment environment variable configuration network security token permission role '
+    'policy bucket storage queue message event stream batch job worker thread process '
+    'library framework module package dependency version release build artifact image '
+    'template component state hook route handler middleware session cookie header payload'
+).split()
+SECTION_TITLES = [
+    'Introduction', 'Prerequisites', 'Step by Step Guide', 'Best Practices', 'Common Pitfalls',
+    'Performance Tips', 'Real World Example', 'Troubleshooting', 'Advanced Configuration', 'Conclusion',
+]
+
+
+def sentence(rng, topic):
+    words = rng.sample(WORDS, rng.randint(8, 16))
+    words.insert(rng.randrange(len(words)), topic)
+    if rng.random() < 0.4:
+        words.insert(rng.randrange(len(words)), rng.choice(TOPICS))
+    return ' '.join(words).capitalize() + '.'
+
+
+def paragraph(rng, topic):
+    return '<p>' + ' '.join(sentence(rng, topic) for _ in range(rng.randint(3, 6))) + '</p>'
+
+
+def synthetic_post(rng, number):
+    """Title, excerpt and HTML body of one synthetic post"""
+    topic, other = rng.sample(TOPICS, 2)
+    action = rng.choice(ACTIONS)
+    title = f'How to {action.capitalize()} {topic.capitalize()} with {other.capitalize()} - Part {number}'
+
+    parts = [paragraph(rng, topic)]
+    for section in rng.sample(SECTION_TITLES, rng.randint(4, 7)):
+        parts.append(f'<h2>{section}</h2>')
+        parts.append(paragraph(rng, topic))
+        if rng.random() < 0.6:
+            parts.append(f'<h3>{action.capitalize()} {other}</h3>')
+            parts.append(paragraph(rng, other))
+        if rng.random() < 0.5:
+            parts.append('<ul>' + ''.join(f'<li>{sentence(rng, topic)}</li>' for _ in range(rng.randint(3, 5))) + '</ul>')
+        if rng.random() < 0.3:
+            parts.append(f'<pre><code class="language-python">import {topic}\n{topic}.{action}(config)</code></pre>')
+
+    parts.append('<h2>Frequently Asked Questions</h2>')
+    for _ in range(rng.randint(3, 5)):
+        parts.append(f'<h3>How do I {rng.choice(ACTIONS)} {topic}?</h3>')
+        parts.append(paragraph(rng, topic))
+    parts.append('<h2>Internal Linking Suggestions</h2>')
+    parts.append('<ul>' + ''.join(
+        f'<li>Anchor text: {rng.choice(TOPICS)} guide - Target slug: /post/{rng.choice(TOPICS)}-{rng.randint(1, 999)}</li>'
+        for _ in range(3)
+    ) + '</ul>')
+
+    excerpt = f'Learn how to {action} {topic} with {other}. ' + sentence(rng, topic)
+    return title, excerpt, '\n'.join(parts)
+
+
+def seed(app, db, Post, Category, post_categories, count, seed_value=42):
+    """Replace the database content with count synthetic posts"""
+    from utils import extract_searchable_content, build_render_artifacts
+
+    rng = random.Random(seed_value)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.execute(Category.__table__.insert(), [
+            {'name': topic.capitalize(), 'slug': topic} for topic in TOPICS
+        ])
+        category_ids = dict(db.session.query(Category.slug, Category.id).all())
+
+        start = time.perf_counter()
+        published_from = datetime(2023, 1, 1)
+        for batch_start in range(1, count + 1, SEED_BATCH):
+            rows, links = [], []
+            for number in range(batch_start, min(batch_start + SEED_BATCH, count + 1)):
+                title, excerpt, content = synthetic_post(rng, number)
+                rows.append({
+                    'id': number,
+                    'title': title,
+                    'slug': f'benchmark-post-{number}',
+                    'content': content,
+                    'searchable_text': extract_searchable_content(content),
+                    **build_render_artifacts(content),  # As stored by Post.update_render_artifacts()
+                    'excerpt': excerpt,
+                    'published_date': published_from + timedelta(minutes=37 * number),
+                    'author': 'Benchmark',
+                    'status': 'draft' if number % 20 == 0 else 'published',
+                })
+                for slug in rng.sample(TOPICS, rng.randint(1, 2)):
+                    links.append({'post_id': number, 'category_id': category_ids[slug]})
+            db.session.execute(Post.__table__.insert(), rows)
+            db.session.execute(post_categories.insert(), links)
+            db.session.commit()
+            print(f"Seeded {min(batch_start + SEED_BATCH - 1, count)}/{count} posts")
+        print(f"✅ Seeded {count} posts in {time.perf_counter() - start:.1f}s")
+
+
+def benchmark_queries(rng, count):
+    """Search strings in the mix a real search box sees - single terms, pairs, prefixes, typos, misses"""
+    queries = []
+    for _ in range(count):
+        kind = rng.random()
+        topic = rng.choice(TOPICS)
+        if kind < 0.35:
+            queries.append(topic)
+        elif kind < 0.6:
+            queries.append(f'{rng.choice(ACTIONS)} {topic}')
+        elif kind < 0.75:
+            queries.append(topic[:max(3, len(topic) - 2)])  # Still typing
+        elif kind < 0.9 and len(topic) > 4:
+            i = rng.randrange(1, len(topic) - 1)
+            queries.append(topic[:i] + topic[i + 1] + topic[i] + topic[i + 2:])  # Swapped letters
+        else:
+            queries.append(f'{topic} zzqx{rng.randint(1, 999)}')  # No results
+    return queries
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def run_benchmark(app, db, urls, label):
+    """Request every url once and print latency percentiles and SQL statements per request"""
+    from sqlalchemy import event
+
+    statements = [0]
+
+    def count_statement(*args):
+        statements[0] += 1
+
+    client = app.test_client()
+    timings, query_counts, errors = [], [], 0
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', count_statement)
+    try:
+        for url in urls:
+            statements[0] = 0
+            start = time.perf_counter()
+            response = client.get(url)
+            timings.append((time.perf_counter() - start) * 1000)
+            query_counts.append(statements[0])
+            if response.status_code != 200:
+                errors += 1
+    finally:
+        event.remove(engine, 'before_cursor_execute', count_statement)
+
+    timings.sort()
+    print(f"{label:<28} n={len(urls):<5} p50={percentile(timings, 0.50):8.2f}ms "
+          f"p95={percentile(timings, 0.95):8.2f}ms p99={percentile(timings, 0.99):8.2f}ms "
+          f"queries avg={sum(query_counts) / max(1, len(query_counts)):5.1f} max={max(query_counts, default=0):3d}"
+          + (f" errors={errors}" if errors else ''))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark /search and /api/search on a synthetic corpus')
+    parser.add_argument('--posts', type=int, default=1000, help='Synthetic posts to seed (e.g. 1000, 10000, 100000)')
+    parser.add_argument('--requests', type=int, default=200, help='Requests per scenario')
+    parser.add_argument('--db', default=DEFAULT_DB, help='SQLite file used for the benchmark database')
+    parser.add_argument('--backend', choices=['index', 'database'], help='Override SEARCH_BACKEND')
+    parser.add_argument('--reseed', action='store_true', help='Reseed even if the database already has --posts posts')
+    args = parser.parse_args()
+
+    # app reads its configuration at import time
+    os.makedirs(os.path.dirname(os.path.abspath(args.db)), exist_ok=True)
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.abspath(args.db)
+    if args.backend:
+        os.environ['SEARCH_BACKEND'] = args.backend
+    import app as blog
+    from app import app, db, Post, Category, post_categories
+
+    with app.app_context():
+        db.create_all()
+        existing = Post.query.count()
+    if args.reseed or existing != args.posts:
+        seed(app, db, Post, Category, post_categories, args.posts)
+
+    print(f"\nBackend: {blog.SEARCH_BACKEND}, result cache size: {blog.SEARCH_CACHE_SIZE}, posts: {args.posts}")
+
+    # The first search builds the index (or the FTS side table) - timed on its own
+    start = time.perf_counter()
+    app.test_client().get('/api/search?q=python')
+    print(f"Cold start (first search builds the index): {(time.perf_counter() - start) * 1000:.0f}ms\n")
+
+    rng = random.Random(7)
+    queries = [quote_plus(q) for q in benchmark_queries(rng, args.requests)]
+    deep_pages = [rng.randint(1, max(1, args.posts // 10)) for _ in range(args.requests)]
+
+    run_benchmark(app, db, [f'/search?q={q}' for q in queries], '/search?q=')
+    run_benchmark(app, db, [f'/api/search?q={q}' for q in queries], '/api/search?q=')
+    run_benchmark(app, db, [f'/api/search?q={q}&page=2' for q in queries], '/api/search?q=&page=2')
+    run_benchmark(app, db, ['/search'] * args.requests, '/search (browse)')
+    run_benchmark(app, db, [f'/api/search?page={page}' for page in deep_pages], '/api/search?page=<deep>')
+
+    cache = blog.search_cache
+    print(f"\nResult cache: {len(cache)} entries, {cache.hits} hits, {cache.misses} misses")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+Query count regression check for the listing pages and post pages
+
+Seeds a throwaway SQLite database with synthetic posts (see benchmark_search.py)
+and requests every listing route, asserting the number of SQL statements it runs.
+Each page shows 10 or 20 posts, so a lazy load per post comes back as a count
+that is at least 10 too high. Listing pages must not select the post bodies either.
+
+Run: python check_query_counts.py
+     python check_query_counts.py --verbose    (print the statements of each request)
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+SEEDED_POSTS = 120
+
+# Route -> SQL statements expected per request
+EXPECTED_QUERIES = {
+    '/': 3,
+    '/?page=3': 3,
+    '/category/python': 3,
+    '/post/benchmark-post-3': 2,
+    '/search': 3,
+    '/search?q=python': 2,
+    '/search?q=python&page=2': 2,
+    '/api/search': 3,
+    '/api/search?q=python': 2,
+    '/api/search?cursor=': 2,
+    '/api/search?q=python&cursor=': 2,
+    '/feed.xml': 2,
+    '/about': 0,
+}
+# Pages that show full bodies - every other page renders cards from Post.preview() with the bodies deferred
+BODY_ROUTES = ('/post/', '/feed.xml')
+BODY_COLUMNS = ('post.content', 'post.rendered_content')
+
+
+def count_queries(app, db, url):
+    """Status code and SQL statements of one GET request"""
+    from sqlalchemy import event
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        response = app.test_client().get(url)
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+    return response.status_code, statements
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check that listing pages run a fixed number of queries')
+    parser.add_argument('--verbose', action='store_true', help='Print every statement')
+    args = parser.parse_args()
+
+    # app reads its configuration at import time
+    directory = tempfile.mkdtemp(prefix='query-counts-')
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(directory, 'check.db')
+    os.environ['PAGE_CACHE_BACKEND'] = 'none'
+    os.environ['PREBUILT_DOCUMENTS'] = 'false'  # Count the queries of rendering the feed, not of reading its file
+    os.environ['SEARCH_CACHE_SIZE'] = '0'
+    os.environ['SEARCH_BACKEND'] = 'index'  # The counts below are for the default backend
+    from app import app, db, Post, Category, post_categories
+    from benchmark_search import seed
+
+    seed(app, db, Post, Category, post_categories, SEEDED_POSTS)
+    # Warm up - the first search builds the index and the first pages load the category, recent posts and next/previous snapshots
+    app.test_client().get('/api/search?q=python')
+    app.test_client().get('/')
+    app.test_client().get('/post/benchmark-post-1')
+
+    failures = 0
+    print()
+    for url, expected in EXPECTED_QUERIES.items():
+        status, statements = count_queries(app, db, url)
+        # paginate()'s COUNT wraps the full column list in a subquery the database does not read
+        loads_bodies = not url.startswith(BODY_ROUTES) and any(
+            column in statement for statement in statements if not statement.startswith('SELECT count(*)')
+            for column in BODY_COLUMNS
+        )
+        ok = status == 200 and len(statements) == expected and not loads_bodies
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {url:<35} {len(statements):>3} queries (expected {expected}, status {status})"
+              + (' - loads post bodies' if loads_bodies else ''))
+        if args.verbose or not ok:
+            for statement in statements:
+                print('      ' + ' '.join(statement.split())[:150])
+
+    print(f"\n{'✅ All listing pages run a fixed number of queries' if not failures else f'❌ {failures} checks failed'}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
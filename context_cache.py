@@ -0,0 +1,80 @@
+"""
+Cached, lazily loaded values for the global template context
+
+The category navigation and the recent posts sidebar are shown on most public
+pages but change only when an admin edits posts. Each is kept as a snapshot of
+plain rows, dropped by a post_events listener (refresh_snapshots in app.py),
+and handed to templates wrapped in a LazySequence so pages that never show them
+never load them.
+
+A snapshot can also follow a shared version (a page cache tag), so workers that
+did not handle the edit reload as soon as the worker that did bumps it; the ttl
+bounds staleness when nothing shared is available.
+"""
+import threading
+import time
+from collections.abc import Sequence
+
+DEFAULT_TTL = 300
+
+
+class SnapshotCache:
+    """Result of loader(), kept until invalidated, its version changes or ttl seconds pass"""
+
+    def __init__(self, loader, ttl=DEFAULT_TTL, version=None):
+        self._loader = loader
+        self._version = version
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._value = None
+        self._loaded_version = None
+        self._expires = 0
+        # Bumped by invalidate() so a snapshot loaded before an invalidation is never stored after it
+        self._generation = 0
+
+    def get(self):
+        version = self._version() if self._version else None
+        with self._lock:
+            if self._value is not None and self._loaded_version == version and time.time() < self._expires:
+                return self._value
+            generation = self._generation
+
+        value = self._loader()
+
+        with self._lock:
+            if generation == self._generation and self.ttl > 0:
+                self._value = value
+                self._loaded_version = version
+                self._expires = time.time() + self.ttl
+        return value
+
+    def invalidate(self):
+        with self._lock:
+            self._value = None
+            self._generation += 1
+
+
+class LazySequence(Sequence):
+    """Read-only list whose items are loaded on first use"""
+
+    def __init__(self, load):
+        self._load = load
+        self._items = None
+
+    @property
+    def items(self):
+        if self._items is None:
+            self._items = list(self._load())
+        return self._items
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __repr__(self):
+        return f'LazySequence({self._items!r})' if self._items is not None else 'LazySequence(<not loaded>)'
@@ -0,0 +1,288 @@
+"""
+Static export - renders the public site to a directory nginx can serve directly
+Run: python export_static.py --base-url https://learningmaster.example --out export
+     python export_static.py --base-url https://learningmaster.example --out export --jobs 4
+     python export_static.py --base-url https://learningmaster.example --out export --full    (re-render everything)
+
+Pages go through the normal views and templates with the Flask test client:
+    /                        -> index.html and page/1/index.html
+    /?page=N                 -> page/N/index.html
+    /post/<slug>             -> post/<slug>/index.html       (published posts)
+    /category/<slug>?page=N  -> category/<slug>/page/N/index.html (page 1 also category/<slug>/index.html)
+    /sitemap.xml, /feed.xml  -> sitemap.xml, feed.xml and rss.xml
+    /feed-full.xml, /atom.xml, /feed.json -> the other feed formats
+    /sitemap-index.xml       -> sitemap-index.xml, sitemap-pages.xml.gz and sitemap-posts-N.xml.gz
+and static/ is copied to static/.
+
+Later runs are incremental. .export-manifest.json remembers, for every page, a key
+built from what the page shows (updated_at of its posts, its next/previous posts,
+the category navigation, the recent posts and the release version) and the hash
+of its output. Only pages whose key changed are rendered again, only files whose
+bytes changed are rewritten, and pages that no longer exist are removed.
+
+nginx:
+    root /srv/export;
+    location = / { try_files /page/$arg_page/index.html /index.html =404; }
+    location /category/ { try_files $uri/page/$arg_page/index.html $uri/index.html =404; }
+    location / { try_files $uri $uri/index.html =404; }
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import quote
+
+from post_neighbors import NeighborMap
+from utils import write_atomic
+
+MANIFEST_NAME = '.export-manifest.json'
+MANIFEST_VERSION = 1
+
+_client = None
+
+
+def page_key(*parts):
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+
+def safe_slug(slug):
+    """Slugs become directory names - anything that could escape the output directory is skipped"""
+    return bool(slug) and '/' not in slug and '\\' not in slug and slug not in ('.', '..')
+
+
+def plan_pages():
+    """Map url -> (key, output files) for every exported page, without rendering anything"""
+    import app as blog
+    from app import db, Post, post_categories
+
+    posts = db.session.query(
+        Post.id, Post.slug, Post.status, Post.published_date, Post.updated_at
+    ).order_by(Post.published_date.desc()).all()
+    post_category_ids = {}
+    for post_id, category_id in db.session.query(post_categories.c.post_id, post_categories.c.category_id):
+        post_category_ids.setdefault(post_id, []).append(category_id)
+    for category_ids in post_category_ids.values():
+        category_ids.sort()
+
+    def version(post):
+        return (post.id, post.updated_at, tuple(post_category_ids.get(post.id, ()))) if post else None
+
+    # Shown on every page: category navigation, recent posts, templates and static assets
+    layout = (blog.RELEASE_VERSION, tuple(blog.load_categories()), tuple(blog.load_recent_posts()))
+    per_page = blog.LISTING_PER_PAGE
+    pages = {}
+
+    def add_listing(url_for_page, files_for_page, name, listed):
+        total = max(1, math.ceil(len(listed) / per_page))
+        for number in range(1, total + 1):
+            shown = listed[(number - 1) * per_page:number * per_page]
+            key = page_key(layout, name, number, total, [version(post) for post in shown])
+            pages[url_for_page(number)] = (key, files_for_page(number))
+
+    # Home page - every status, like app.index
+    add_listing(
+        lambda number: '/' if number == 1 else f'/?page={number}',
+        lambda number: ['index.html', 'page/1/index.html'] if number == 1 else [f'page/{number}/index.html'],
+        'index', posts
+    )
+
+    for category in blog.load_categories():
+        if not safe_slug(category.slug):
+            print(f"⚠️  Skipping category with unsafe slug {category.slug!r}")
+            continue
+        listed = [post for post in posts if category.id in post_category_ids.get(post.id, ())]
+        base = f'category/{category.slug}'
+        add_listing(
+            lambda number, slug=quote(category.slug): f'/category/{slug}' if number == 1 else f'/category/{slug}?page={number}',
+            lambda number, base=base: [f'{base}/index.html', f'{base}/page/1/index.html'] if number == 1 else [f'{base}/page/{number}/index.html'],
+            f'category:{category.slug}', listed
+        )
+
+    # Next/previous links come from the same map of published posts as app.adjacent_posts
+    published = [post for post in posts if post.status == 'published']
+    by_id = {post.id: post for post in published}
+    neighbors = NeighborMap()
+    neighbors.build((post.id, post.slug, None, post.published_date) for post in published)
+    for post in published:
+        if not safe_slug(post.slug):
+            print(f"⚠️  Skipping post {post.id} with unsafe slug {post.slug!r}")
+            continue
+        next_post, prev_post = (
+            by_id[neighbor.id] if neighbor else None for neighbor in neighbors.neighbors(post.id, post.published_date)
+        )
+        key = page_key(layout, 'post', version(post), version(next_post), version(prev_post))
+        pages[f'/post/{quote(post.slug)}'] = (key, [f'post/{post.slug}/index.html'])
+
+    # Home and category lastmods follow the published posts (and their categories), static pages their templates
+    sitemap_version = (layout, sorted(blog.STATIC_PAGE_LASTMODS.items()), [version(post) for post in published])
+    pages['/sitemap.xml'] = (page_key(sitemap_version, 'sitemap'), ['sitemap.xml'])
+    pages['/sitemap-pages.xml.gz'] = (page_key(sitemap_version, 'sitemap-pages'), ['sitemap-pages.xml.gz'])
+    sitemap_posts = {}
+    for post in sorted(published, key=lambda post: post.id):
+        number = (post.id - 1) // blog.POSTS_PER_SITEMAP + 1
+        sitemap_posts.setdefault(number, []).append((post.slug, post.updated_at))
+    for number, listed in sitemap_posts.items():
+        pages[f'/sitemap-posts-{number}.xml.gz'] = (
+            page_key('sitemap-posts', number, listed), [f'sitemap-posts-{number}.xml.gz']
+        )
+    pages['/sitemap-index.xml'] = (
+        page_key(sitemap_version, 'sitemap-index'),
+        ['sitemap-index.xml']
+    )
+    feed_key = page_key(layout, 'feed', [version(post) for post in published[:blog.FEED_SIZE]])
+    pages['/feed.xml'] = (feed_key, ['feed.xml', 'rss.xml'])
+    for url in ('/feed-full.xml', '/atom.xml', '/feed.json'):
+        pages[url] = (feed_key, [url.lstrip('/')])
+    return pages
+
+
+def _init_worker():
+    """Per process test client; connections inherited from the parent process are not reused"""
+    global _client
+    from app import app, db
+    with app.app_context():
+        db.engine.dispose(close=False)
+    _client = app.test_client()
+
+
+def render_page(task):
+    """Render one url and write its files; returns (url, sha256 of the output or None, status code)"""
+    url, files, previous_sha, base_url, out = task
+    response = _client.get(url, base_url=base_url)
+    if response.status_code != 200:
+        return url, None, response.status_code
+    data = response.get_data()
+    sha = hashlib.sha256(data).hexdigest()
+    for name in files:
+        path = os.path.join(out, name)
+        if sha != previous_sha or not os.path.exists(path):
+            write_atomic(path, data)
+    return url, sha, response.status_code
+
+
+def copy_static(source, target):
+    """Copy static files that are new or changed since the last export; returns the number copied"""
+    copied = 0
+    for current, _, names in os.walk(source):
+        for name in names:
+            path = os.path.join(current, name)
+            destination = os.path.join(target, os.path.relpath(path, source))
+            stat = os.stat(path)
+            try:
+                existing = os.stat(destination)
+                if existing.st_size == stat.st_size and int(existing.st_mtime) == int(stat.st_mtime):
+                    continue
+            except OSError:
+                pass
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            shutil.copy2(path, destination)
+            copied += 1
+    return copied
+
+
+def remove_files(out, files):
+    """Delete exported files and the directories they leave empty"""
+    for name in files:
+        path = os.path.join(out, name)
+        if os.path.exists(path):
+            os.remove(path)
+        directory = os.path.dirname(path)
+        while os.path.abspath(directory) != os.path.abspath(out):
+            try:
+                os.rmdir(directory)
+            except OSError:
+                break
+            directory = os.path.dirname(directory)
+
+
+def load_manifest(path, base_url):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    # Absolute URLs in the sitemap, feed and meta tags depend on the base URL
+    if manifest.get('version') != MANIFEST_VERSION or manifest.get('base_url') != base_url:
+        return {}
+    return manifest.get('pages', {})
+
+
+def export_site(base_url, out, jobs=None, full=False):
+    from app import app
+
+    out = os.path.abspath(out)
+    os.makedirs(out, exist_ok=True)
+    manifest_path = os.path.join(out, MANIFEST_NAME)
+    previous = {} if full else load_manifest(manifest_path, base_url)
+
+    start = time.perf_counter()
+    with app.app_context():
+        pages = plan_pages()
+    tasks = [
+        (url, files, previous.get(url, {}).get('sha'), base_url, out)
+        for url, (key, files) in pages.items()
+        if previous.get(url, {}).get('key') != key
+    ]
+    print(f"{len(pages)} pages, {len(tasks)} to render")
+
+    rendered = {}
+    failed = 0
+    jobs = jobs or os.cpu_count() or 1
+    if jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker) as executor:
+            results = list(executor.map(render_page, tasks, chunksize=max(1, len(tasks) // (jobs * 4))))
+    else:
+        _init_worker()
+        results = [render_page(task) for task in tasks]
+    for url, sha, status in results:
+        if sha is None:
+            failed += 1
+            print(f"❌ {url} returned {status}")
+        else:
+            rendered[url] = sha
+
+    new_manifest = {}
+    for url, (key, files) in pages.items():
+        if url in rendered:
+            new_manifest[url] = {'key': key, 'sha': rendered[url], 'files': files}
+        elif url in previous:
+            # Unchanged, or failed this time - keep the old files; a changed key is retried next run
+            new_manifest[url] = previous[url]
+
+    # Files of pages that are gone (unpublished posts, emptied listing pages, renamed slugs)
+    stale = {name for url, entry in previous.items() for name in entry.get('files', [])}
+    stale -= {name for entry in new_manifest.values() for name in entry['files']}
+    remove_files(out, stale)
+
+    copied = copy_static(app.static_folder, os.path.join(out, 'static'))
+    write_atomic(manifest_path, json.dumps(
+        {'version': MANIFEST_VERSION, 'base_url': base_url, 'pages': new_manifest}, indent=1, sort_keys=True
+    ).encode('utf-8'))
+
+    print(f"✅ Rendered {len(rendered)} pages, removed {len(stale)} files, copied {copied} static files "
+          f"in {time.perf_counter() - start:.1f}s with {jobs} worker(s)")
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render the public site to static files')
+    parser.add_argument('--base-url', required=True, help='Public URL of the site, used in the sitemap, feed and meta tags')
+    parser.add_argument('--out', default='export', help='Output directory')
+    parser.add_argument('--jobs', type=int, help='Render processes (default: CPU count)')
+    parser.add_argument('--full', action='store_true', help='Ignore the previous export and render every page')
+    args = parser.parse_args()
+
+    # app reads its configuration at import time - rendered pages must not come from or fill the page cache
+    os.environ['PAGE_CACHE_BACKEND'] = 'none'
+    os.environ['PREBUILT_DOCUMENTS'] = 'false'
+    failed = export_site(args.base_url.rstrip('/') + '/', args.out, jobs=args.jobs, full=args.full)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
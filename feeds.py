@@ -0,0 +1,184 @@
+"""
+Feed engine - one item model, several formats
+
+The latest published posts are turned into plain FeedItem objects once per
+content version, and every format is serialized from those same items:
+    rss     RSS 2.0 with a text summary                    /feed.xml, /rss.xml
+    full    RSS 2.0 with the whole post in content:encoded /feed-full.xml
+    atom    Atom 1.0                                       /atom.xml
+    json    JSON Feed 1.1                                  /feed.json
+Items hold site-relative paths, so one model serves every site url; serialized
+documents are cached per format and site url until the version changes.
+"""
+import json
+import threading
+from xml.sax.saxutils import escape, quoteattr
+
+RFC822 = '%a, %d %b %Y %H:%M:%S +0000'
+RFC3339 = '%Y-%m-%dT%H:%M:%SZ'
+MAX_CACHED_DOCUMENTS = 32  # (format, site url) pairs kept - site urls come from the request's Host header
+
+
+class FeedItem:
+    """What every feed format needs to know about a post"""
+    __slots__ = ('path', 'title', 'summary', 'content_html', 'author', 'published', 'updated', 'categories', 'image')
+
+    def __init__(self, path, title, summary, content_html, author, published, updated, categories=(), image=None):
+        self.path = path  # Site-relative url of the post, also its permanent id
+        self.title = title
+        self.summary = summary  # Plain text
+        self.content_html = content_html
+        self.author = author
+        self.published = published  # Naive UTC datetimes
+        self.updated = updated or published
+        self.categories = categories  # Names
+        self.image = image
+
+
+def cdata(text):
+    """CDATA section holding text - a ']]>' inside it is split over two sections"""
+    return '<![CDATA[' + (text or '').replace(']]>', ']]]]><![CDATA[>') + ']]>'
+
+
+def serialize_rss(feed, items, base_url, full=False):
+    rss = ['<?xml version="1.0" encoding="UTF-8"?>']
+    rss.append('<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom" xmlns:content="http://purl.org/rss/1.0/modules/content/">')
+    rss.append('<channel>')
+    rss.append(f'<title>{escape(feed.title)}</title>')
+    rss.append(f'<link>{escape(base_url)}</link>')
+    rss.append(f'<description>{escape(feed.description)}</description>')
+    rss.append(f'<language>{feed.language}</language>')
+    if items:
+        rss.append(f'<lastBuildDate>{max(item.updated for item in items).strftime(RFC822)}</lastBuildDate>')
+    rss.append(f'<atom:link href={quoteattr(base_url + feed.paths["full" if full else "rss"])} rel="self" type="application/rss+xml"/>')
+    for item in items:
+        link = escape(base_url + item.path)
+        rss.append('<item>')
+        rss.append(f'<title>{cdata(item.title)}</title>')
+        rss.append(f'<link>{link}</link>')
+        rss.append(f'<guid>{link}</guid>')
+        rss.append(f'<description>{cdata(item.summary)}</description>')
+        if full:
+            rss.append(f'<content:encoded>{cdata(item.content_html)}</content:encoded>')
+        rss.append(f'<pubDate>{item.published.strftime(RFC822)}</pubDate>')
+        rss.append(f'<author>{escape(item.author or "")}</author>')
+        for name in item.categories[:3]:
+            rss.append(f'<category>{cdata(name)}</category>')
+        rss.append('</item>')
+    rss.append('</channel>')
+    rss.append('</rss>')
+    return '\n'.join(rss)
+
+
+def serialize_atom(feed, items, base_url):
+    updated = max((item.updated for item in items), default=None)
+    atom = ['<?xml version="1.0" encoding="UTF-8"?>']
+    atom.append('<feed xmlns="http://www.w3.org/2005/Atom">')
+    atom.append(f'<title>{escape(feed.title)}</title>')
+    atom.append(f'<subtitle>{escape(feed.description)}</subtitle>')
+    atom.append(f'<link href={quoteattr(base_url)}/>')
+    atom.append(f'<link rel="self" type="application/atom+xml" href={quoteattr(base_url + feed.paths["atom"])}/>')
+    atom.append(f'<id>{escape(base_url)}</id>')
+    if updated:
+        atom.append(f'<updated>{updated.strftime(RFC3339)}</updated>')
+    for item in items:
+        link = base_url + item.path
+        atom.append('<entry>')
+        atom.append(f'<title>{escape(item.title)}</title>')
+        atom.append(f'<link href={quoteattr(link)}/>')
+        atom.append(f'<id>{escape(link)}</id>')
+        atom.append(f'<published>{item.published.strftime(RFC3339)}</published>')
+        atom.append(f'<updated>{item.updated.strftime(RFC3339)}</updated>')
+        atom.append(f'<author><name>{escape(item.author or "")}</name></author>')
+        for name in item.categories:
+            atom.append(f'<category term={quoteattr(name)}/>')
+        atom.append(f'<summary>{escape(item.summary)}</summary>')
+        atom.append('</entry>')
+    atom.append('</feed>')
+    return '\n'.join(atom)
+
+
+def serialize_json(feed, items, base_url):
+    document = {
+        'version': 'https://jsonfeed.org/version/1.1',
+        'title': feed.title,
+        'description': feed.description,
+        'home_page_url': base_url,
+        'feed_url': base_url + feed.paths['json'],
+        'language': feed.language,
+        'items': [
+            {
+                'id': base_url + item.path,
+                'url': base_url + item.path,
+                'title': item.title,
+                'summary': item.summary,
+                'content_text': item.summary,
+                'image': item.image,
+                'date_published': item.published.strftime(RFC3339),
+                'date_modified': item.updated.strftime(RFC3339),
+                'authors': [{'name': item.author}] if item.author else [],
+                'tags': list(item.categories),
+            }
+            for item in items
+        ],
+    }
+    return json.dumps(document, ensure_ascii=False, indent=1)
+
+
+# format -> (serializer, mimetype)
+FORMATS = {
+    'rss': (serialize_rss, 'application/rss+xml'),
+    'full': (lambda feed, items, base_url: serialize_rss(feed, items, base_url, full=True), 'application/rss+xml'),
+    'atom': (serialize_atom, 'application/atom+xml'),
+    'json': (serialize_json, 'application/feed+json'),
+}
+
+
+class FeedEngine:
+    """
+    Feeds of the items load_items() returns, rebuilt when version() changes.
+    paths maps each format to the site-relative url it is served at (for self links).
+    """
+
+    def __init__(self, load_items, version, paths, title, description, language='en-us'):
+        self._load_items = load_items
+        self._version = version
+        self.paths = paths
+        self.title = title
+        self.description = description
+        self.language = language
+        self._lock = threading.Lock()
+        self._items = None
+        self._items_version = None
+        self._documents = {}  # (format, base_url) -> (version, bytes)
+
+    def items(self):
+        version = self._version()
+        with self._lock:
+            if self._items is not None and self._items_version == version:
+                return self._items
+        items = self._load_items()
+        with self._lock:
+            self._items, self._items_version = items, version
+        return items
+
+    def render(self, format, base_url):
+        """Bytes of the feed in format for a site url ending in '/' - served from the cache while current"""
+        version = self._version()
+        key = (format, base_url.rstrip('/'))
+        with self._lock:
+            cached = self._documents.get(key)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+        serialize, _ = FORMATS[format]
+        data = serialize(self, self.items(), key[1]).encode('utf-8')
+        with self._lock:
+            if key not in self._documents and len(self._documents) >= MAX_CACHED_DOCUMENTS:
+                self._documents.clear()
+            self._documents[key] = (version, data)
+        return data
+
+    def invalidate(self):
+        with self._lock:
+            self._items = None
+            self._documents.clear()
@@ -0,0 +1,99 @@
+"""
+Conditional GET (ETag / Last-Modified / 304) for public pages
+
+Views decorated with conditional() get their validators from a cheap function
+called before the view runs - typically the global content version kept in
+app.py, which changes whenever any post is created, edited or deleted (deletes
+are recorded in the content_version table, as they leave no updated_at). A client
+presenting a matching If-None-Match (or, without one, an If-Modified-Since not
+older than Last-Modified) gets an empty 304 without any query or template
+rendering. Responses carry 'Cache-Control: no-cache' so browsers revalidate
+instead of guessing a freshness lifetime from Last-Modified.
+
+Logged in admins see extra links and drafts, so their requests are never
+answered with 304 and their pages carry no validators.
+"""
+import hashlib
+import os
+from datetime import timezone
+from functools import wraps
+
+from flask import request, session, make_response, Response
+
+
+def make_etag(*parts):
+    """Opaque entity tag for the given version parts"""
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()[:20]
+
+
+def release_fingerprint(template_folder, *extra):
+    """
+    Hash of the templates (and extra values such as the static manifest), so
+    validators change with a deploy that changes the markup but no content
+    """
+    digest = hashlib.sha1(repr(extra).encode('utf-8'))
+    for current, dirs, names in os.walk(template_folder):
+        dirs.sort()
+        for name in sorted(names):
+            path = os.path.join(current, name)
+            digest.update(os.path.relpath(path, template_folder).encode('utf-8'))
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+
+def _http_date(value):
+    """Naive UTC datetime as an aware one at second precision, like HTTP dates"""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.replace(microsecond=0)
+
+
+def _not_modified(etag, last_modified):
+    if request.if_none_match:
+        # If-None-Match wins over If-Modified-Since when both are sent. '*' is for
+        # conditional writes ("only if it does not exist") - on a GET it never matches
+        return not request.if_none_match.star_tag and request.if_none_match.contains_weak(etag)
+    if request.if_modified_since and last_modified:
+        return last_modified <= request.if_modified_since
+    return False
+
+
+def _set_validators(response, etag, last_modified):
+    if etag:
+        response.set_etag(etag, weak=True)
+    if last_modified:
+        response.last_modified = last_modified
+    if not response.cache_control:
+        response.cache_control.no_cache = True
+
+
+def conditional(get_validators):
+    """
+    Decorator answering conditional GETs from get_validators(*args, **kwargs),
+    which returns (etag, last_modified) - last_modified a naive UTC datetime or None
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or session.get('admin_logged_in'):
+                return view(*args, **kwargs)
+
+            etag, last_modified = get_validators(*args, **kwargs)
+            last_modified = _http_date(last_modified)
+            if _not_modified(etag, last_modified):
+                response = Response(status=304)
+                _set_validators(response, etag, last_modified)
+                return response
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                if 'ETag' in response.headers:
+                    # The view described what it served itself - like bytes older than the content version
+                    etag, last_modified = None, None
+                _set_validators(response, etag, last_modified)
+            return response
+        return wrapper
+    return decorator
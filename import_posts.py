@@ -94,6 +94,9 @@ def import_posts(json_file='blog_posts.json'):
                     post_id=post_data.get('post_id', '')
                 )
                 
+                post.update_searchable_text()
+                post.update_render_artifacts()
+                
                 # Add categories
                 post.categories = categories
                 
@@ -0,0 +1,112 @@
+"""
+Cursor pagination for the infinite-scroll API
+
+Listings are ordered newest first on (published_date, id), so the next page
+starts strictly after the last post already shown. That is a plain index range
+scan - no COUNT and no OFFSET - and posts published while a reader scrolls
+don't shift or repeat the rest of the list.
+
+Cursors are opaque to clients: URL-safe base64 of a small JSON list.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+
+import sqlalchemy as sa
+
+# Ids the database can bind - a larger one would raise OverflowError in the driver
+MAX_ID = 2 ** 63 - 1
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor was not produced by encode_cursor()"""
+
+
+def encode_cursor(kind, *values):
+    """Opaque cursor string for the given kind ('date' or 'rank') and position values"""
+    raw = json.dumps([kind, *values], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, kind):
+    """Position values stored in a cursor of the given kind"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        data = json.loads(raw)
+    except (binascii.Error, ValueError) as e:
+        raise InvalidCursor('Malformed cursor') from e
+    if not isinstance(data, list) or not data or data[0] != kind:
+        raise InvalidCursor('Cursor does not belong to this listing')
+    return data[1:]
+
+
+class CursorPage:
+    """One page of a cursor paginated listing"""
+
+    def __init__(self, items, next_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def date_cursor(post):
+    """Cursor pointing just after post in a newest first listing"""
+    return encode_cursor('date', post.published_date.isoformat(), post.id)
+
+
+def paginate_by_date(query, model, cursor=None, per_page=10):
+    """
+    Page of query, newest first, starting after cursor (None for the first page).
+    One extra row is fetched to know whether another page exists.
+    """
+    query = query.order_by(model.published_date.desc(), model.id.desc())
+    if cursor:
+        values = decode_cursor(cursor, 'date')
+        try:
+            published_date, post_id = datetime.fromisoformat(values[0]), int(values[1])
+        except (IndexError, TypeError, ValueError) as e:
+            raise InvalidCursor('Malformed cursor') from e
+        if not 0 <= post_id <= MAX_ID:
+            raise InvalidCursor('Malformed cursor')
+        query = query.filter(sa.or_(
+            model.published_date < published_date,
+            sa.and_(model.published_date == published_date, model.id < post_id),
+        ))
+
+    rows = query.limit(per_page + 1).all()
+    items = rows[:per_page]
+    next_cursor = date_cursor(items[-1]) if len(rows) > per_page else None
+    return CursorPage(items, next_cursor)
+
+
+def rank_cursor(position):
+    """Cursor pointing at position in a ranked list of search results"""
+    return encode_cursor('rank', position)
+
+
+def paginate_ranked_ids(ids, model, cursor=None, per_page=10, options=()):
+    """
+    Page of an already ranked list of post ids, starting at cursor. Search results
+    are ordered by relevance rather than date, so their cursor is a rank position.
+    """
+    position = 0
+    if cursor:
+        values = decode_cursor(cursor, 'rank')
+        try:
+            position = max(0, int(values[0]))
+        except (IndexError, TypeError, ValueError) as e:
+            raise InvalidCursor('Malformed cursor') from e
+
+    page_ids = ids[position:position + per_page]
+    items = []
+    if page_ids:
+        query = model.query.options(*options).filter(model.id.in_(page_ids))
+        posts = {post.id: post for post in query.all()}
+        items = [posts[post_id] for post_id in page_ids if post_id in posts]
+    end = position + len(page_ids)
+    next_cursor = rank_cursor(end) if end < len(ids) else None
+    return CursorPage(items, next_cursor)
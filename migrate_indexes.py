@@ -0,0 +1,164 @@
+"""
+Database migration script to add the indexes behind the hot queries
+Run: python migrate_indexes.py                  (create missing indexes, EXPLAIN before and after)
+     python migrate_indexes.py --explain-only   (only print the current plans)
+
+The indexes are declared on the models (Post.__table_args__, post_categories,
+PostSEO.seo_score and PostImage.post_id), so new databases get them from
+db.create_all(); this script adds them to existing SQLite and MySQL databases.
+post_seo.post_id is already indexed by its unique constraint.
+"""
+import sys
+from datetime import datetime
+
+from sqlalchemy import text
+
+from app import app, db, Post, post_categories
+import admin_seo
+
+# (label, SQL, parameters) - the shapes the app runs on every page or admin view
+HOT_QUERIES = [
+    ('Published listing (feed, sitemap, search browse)',
+     "SELECT id, title FROM post WHERE status = :status ORDER BY published_date DESC LIMIT 10",
+     {'status': 'published'}),
+    ('Published keyset page (/api/search?cursor=)',
+     "SELECT id, title FROM post WHERE status = :status AND (published_date < :date OR "
+     "(published_date = :date AND id < :id)) ORDER BY published_date DESC, id DESC LIMIT 11",
+     {'status': 'published', 'date': datetime(2024, 1, 1), 'id': 1000}),
+    ('Home page',
+     "SELECT id, title FROM post ORDER BY published_date DESC LIMIT 10 OFFSET 20",
+     {}),
+    ('Next post link',
+     "SELECT id, slug FROM post WHERE published_date > :date ORDER BY published_date ASC LIMIT 1",
+     {'date': datetime(2024, 1, 1)}),
+    ('Previous post link',
+     "SELECT id, slug FROM post WHERE published_date < :date ORDER BY published_date DESC LIMIT 1",
+     {'date': datetime(2024, 1, 1)}),
+    ('Posts per status (admin dashboard)',
+     "SELECT count(*) FROM post WHERE status = :status",
+     {'status': 'draft'}),
+    ('Recently created (admin dashboard)',
+     "SELECT id, title FROM post ORDER BY created_at DESC LIMIT 10",
+     {}),
+    ('Content version (conditional GET)',
+     "SELECT count(id), max(updated_at) FROM post",
+     {}),
+    ('Category listing',
+     "SELECT post.id, post.title FROM post JOIN post_categories ON post.id = post_categories.post_id "
+     "JOIN category ON category.id = post_categories.category_id WHERE category.slug = :slug "
+     "ORDER BY post.published_date DESC LIMIT 10",
+     {'slug': 'python'}),
+    ('Category lastmod (sitemap)',
+     "SELECT post_categories.category_id, max(post.updated_at) FROM post_categories JOIN post ON post.id = "
+     "post_categories.post_id WHERE post.status = :status GROUP BY post_categories.category_id",
+     {'status': 'published'}),
+    ('Posts of a category',
+     "SELECT post_id FROM post_categories WHERE category_id = :category_id",
+     {'category_id': 1}),
+    ('Weakest posts (admin post list sorted by SEO score)',
+     "SELECT post.id, post.title, post_seo.seo_score FROM post JOIN post_seo ON post_seo.post_id = post.id "
+     "ORDER BY post_seo.seo_score ASC, post_seo.post_id ASC LIMIT 50",
+     {}),
+    ('Weakest published posts of a category (admin post list)',
+     "SELECT post.id, post.title, post_seo.seo_score FROM post JOIN post_seo ON post_seo.post_id = post.id "
+     "JOIN post_categories ON post_categories.post_id = post.id WHERE post_categories.category_id = :category_id "
+     "AND post.status = :status ORDER BY post_seo.seo_score ASC, post_seo.post_id ASC LIMIT 50",
+     {'category_id': 1, 'status': 'published'}),
+    ('SEO record of a post (admin)',
+     "SELECT seo_score FROM post_seo WHERE post_id = :post_id",
+     {'post_id': 1}),
+    ('Images of a post (admin)',
+     "SELECT image_url FROM post_images WHERE post_id = :post_id",
+     {'post_id': 1}),
+]
+
+
+def indexed_tables():
+    """Tables whose model declares indexes; the SEO ones exist only once the SEO admin is set up"""
+    tables = [Post.__table__, post_categories]
+    for model in (admin_seo.PostSEO, admin_seo.PostImage):
+        if model is not None:
+            tables.append(model.__table__)
+    return tables
+
+
+def explain(sql, params):
+    """Plan lines for a query on the current database"""
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        rows = db.session.execute(text('EXPLAIN QUERY PLAN ' + sql), params).fetchall()
+        return [row[-1] for row in rows]
+    result = db.session.execute(text('EXPLAIN ' + sql), params)
+    if dialect == 'mysql':
+        return [
+            f"table={row['table']} type={row['type']} key={row['key']} rows={row['rows']} {row['Extra'] or ''}".rstrip()
+            for row in result.mappings()
+        ]
+    return [' '.join(str(value) for value in row) for row in result]
+
+
+def print_plans(title):
+    print(f"\n{'=' * 70}\n{title}\n{'=' * 70}")
+    tables = set(db.inspect(db.engine).get_table_names())
+    for label, sql, params in HOT_QUERIES:
+        if not all(table in tables for table in ('post_seo', 'post_images') if table in sql):
+            continue
+        print(f"\n{label}")
+        try:
+            for line in explain(sql, params):
+                print(f"   {line}")
+        except Exception as e:
+            print(f"   ⚠️  Could not explain: {e}")
+            db.session.rollback()
+
+
+def create_indexes():
+    """Create the declared indexes that the database does not have yet"""
+    inspector = db.inspect(db.engine)
+    tables = set(inspector.get_table_names())
+    created = 0
+    print("\nChecking indexes...")
+    for table in indexed_tables():
+        if table.name not in tables:
+            print(f"⚠️  Table {table.name} does not exist yet - skipped")
+            continue
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            columns = ', '.join(column.name for column in index.columns)
+            if index.name in existing:
+                print(f"✅ Index {index.name} already exists")
+                continue
+            try:
+                index.create(db.engine)
+                created += 1
+                print(f"✅ Created index {index.name} on {table.name} ({columns})")
+            except Exception as e:
+                print(f"⚠️  Could not create index {index.name}: {e}")
+
+    # Refresh the planner statistics so the new indexes are considered
+    if created:
+        if db.engine.dialect.name == 'mysql':
+            names = ', '.join(table.name for table in indexed_tables() if table.name in tables)
+            db.session.execute(text(f'ANALYZE TABLE {names}'))
+        elif db.engine.dialect.name == 'sqlite':
+            db.session.execute(text('ANALYZE'))
+        db.session.commit()
+    return created
+
+
+def migrate_indexes(explain_only=False):
+    with app.app_context():
+        try:
+            print_plans('Query plans before' if not explain_only else 'Query plans')
+            if explain_only:
+                return
+            created = create_indexes()
+            print_plans('Query plans after')
+            print(f"\n✅ Migration complete! {created} index(es) created")
+        except Exception as e:
+            print(f"❌ Migration error: {e}")
+            db.session.rollback()
+
+
+if __name__ == '__main__':
+    migrate_indexes(explain_only='--explain-only' in sys.argv)
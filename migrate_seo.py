@@ -28,7 +28,13 @@ def migrate_database():
                 'excerpt': 'TEXT',
                 'featured_image': 'VARCHAR(500)',
                 'status': "VARCHAR(20) DEFAULT 'published'",
-                'is_featured': 'BOOLEAN DEFAULT 0'
+                'is_featured': 'BOOLEAN DEFAULT 0',
+                'searchable_text': 'TEXT',  # Fill with: python backfill_searchable_text.py
+                # Render artifacts, filled by the same backfill script
+                'rendered_content': 'MEDIUMTEXT' if db.engine.dialect.name == 'mysql' else 'TEXT',
+                'plain_excerpt': 'TEXT',
+                'first_image': 'TEXT',
+                'schema_description': 'TEXT'
             }
             
             for col_name, col_type in new_columns.items():
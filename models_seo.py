@@ -10,6 +10,8 @@ from sqlalchemy.orm import relationship
 class PostSEO(db.Model):
     """SEO metadata for blog posts"""
     __tablename__ = 'post_seo'
+    # Admin post list sorted or filtered by score (weakest posts first)
+    __table_args__ = (db.Index('ix_post_seo_seo_score', 'seo_score', 'post_id'),)
     
     id = db.Column(Integer, primary_key=True)
     post_id = db.Column(Integer, db.ForeignKey('post.id'), unique=True, nullable=False)
@@ -56,7 +58,7 @@ class PostImage(db.Model):
     __tablename__ = 'post_images'
     
     id = db.Column(Integer, primary_key=True)
-    post_id = db.Column(Integer, db.ForeignKey('post.id'), nullable=False)
+    post_id = db.Column(Integer, db.ForeignKey('post.id'), nullable=False, index=True)
     image_url = db.Column(String(500), nullable=False)
     alt_text = db.Column(String(200), nullable=False)
     caption = db.Column(Text)
@@ -0,0 +1,349 @@
+"""
+Full-page cache for anonymous GET requests on public routes
+
+Every cached page is tagged with what it shows: post:<id> for each post whose
+title or content appears on it, category:<slug> for category listings,
+listing for the date ordered home page, layout for the category navigation
+and recent for the "recent posts" sidebar. Admin changes purge exactly the
+affected tags through a post_events listener (purge_cached_pages in app.py).
+
+Tags are versioned counters: an entry remembers the versions of its tags when it
+was stored and is ignored once any of them moved on, so a purge is a handful of
+increments whatever the number of pages - and works the same on every backend.
+
+Pages are keyed by scheme, host and path plus only the query arguments the view
+reads, so neither a spoofed Host header nor made up query strings can put pages
+under another url's key. With a configured site url, requests for any other host
+are not cached at all.
+
+Backends (PAGE_CACHE_BACKEND):
+    memory      - per process dictionary, least recently used pages evicted (default)
+    filesystem  - files under PAGE_CACHE_DIR, shared by workers on one host, oldest pages evicted
+    redis       - any Redis-compatible server at PAGE_CACHE_REDIS_URL (needs the redis package)
+    none        - disabled
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import urlencode
+
+from flask import g, request, session, make_response, Response
+
+from utils import write_atomic
+
+DEFAULT_TTL = 3600  # Bounds staleness of things no tag covers, like the footer date
+DEFAULT_MAX_ENTRIES = 5000  # Cached pages kept per backend; tag versions are never evicted
+
+
+class MemoryBackend:
+    """
+    Thread-safe dictionary with expiry, private to the process. Entries stored with a
+    ttl (pages) are evicted least recently used first beyond max_entries; the others
+    (tag versions, fingerprints) are few and kept, since forgetting a tag version
+    could make an old page current again.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._pinned = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._pinned:
+                return self._pinned[key]
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def get_many(self, keys):
+        return [self.get(key) for key in keys]
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            if not ttl:
+                self._pinned[key] = value
+                return
+            self._data[key] = (value, time.time() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def incr(self, key):
+        with self._lock:
+            value = int(self._pinned.get(key, 0)) + 1
+            self._pinned[key] = value
+            return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._pinned.clear()
+
+
+class FilesystemBackend:
+    """
+    One file per key, written atomically so concurrent workers never read half a page.
+    Entries stored with a ttl get their own suffix, and once more than max_entries of
+    them exist the oldest are removed - checked every PRUNE_INTERVAL writes.
+    """
+
+    EXPIRING_SUFFIX = '.page'
+    PRUNE_INTERVAL = 100
+
+    def __init__(self, directory, max_entries=DEFAULT_MAX_ENTRIES):
+        self.directory = directory
+        self.max_entries = max_entries
+        self._writes = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key, expiring=False):
+        name = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, name + self.EXPIRING_SUFFIX if expiring else name)
+
+    def get(self, key):
+        for expiring in (True, False):
+            try:
+                with open(self._path(key, expiring), 'r', encoding='utf-8') as f:
+                    item = json.load(f)
+                break
+            except (OSError, ValueError):
+                continue
+        else:
+            return None
+        if item['expires'] and item['expires'] < time.time():
+            return None
+        return item['value']
+
+    def get_many(self, keys):
+        return [self.get(key) for key in keys]
+
+    def set(self, key, value, ttl=None):
+        item = {'value': value, 'expires': time.time() + ttl if ttl else None}
+        write_atomic(self._path(key, expiring=bool(ttl)), json.dumps(item).encode('utf-8'))
+        if ttl:
+            self._writes += 1
+            if self._writes % self.PRUNE_INTERVAL == 0:
+                self._prune()
+
+    def incr(self, key):
+        # Not atomic across processes; a lost increment still moves the version past
+        # every entry stored before the purge, which is all invalidation needs
+        value = int(self.get(key) or 0) + 1
+        self.set(key, value)
+        return value
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+    def _prune(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(self.EXPIRING_SUFFIX):
+                try:
+                    entries.append((entry.stat().st_mtime, entry.path))
+                except OSError:
+                    continue
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort()
+        for _, path in entries[:len(entries) - self.max_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class RedisBackend:
+    """Redis or any server speaking its protocol (Valkey, KeyDB, Dragonfly)"""
+
+    def __init__(self, url, prefix='pagecache:'):
+        import redis  # Optional dependency, only needed for this backend
+        self._redis = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self._redis.get(self.prefix + key)
+        return json.loads(value) if value is not None else None
+
+    def get_many(self, keys):
+        if not keys:
+            return []
+        values = self._redis.mget([self.prefix + key for key in keys])
+        return [json.loads(value) if value is not None else None for value in values]
+
+    def set(self, key, value, ttl=None):
+        self._redis.set(self.prefix + key, json.dumps(value), ex=ttl or None)
+
+    def incr(self, key):
+        return self._redis.incr(self.prefix + key)
+
+    def clear(self):
+        for key in self._redis.scan_iter(match=self.prefix + '*'):
+            self._redis.delete(key)
+
+
+def create_backend(name, directory=None, redis_url=None, max_entries=DEFAULT_MAX_ENTRIES):
+    """Backend for a PAGE_CACHE_BACKEND value, or None when caching is disabled"""
+    name = (name or 'memory').strip().lower()
+    if name == 'memory':
+        return MemoryBackend(max_entries)
+    if name == 'filesystem':
+        return FilesystemBackend(directory or os.path.join(tempfile.gettempdir(), 'learningmaster-page-cache'), max_entries)
+    if name == 'redis':
+        try:
+            return RedisBackend(redis_url or 'redis://localhost:6379/0')
+        except ImportError:
+            print("⚠️  PAGE_CACHE_BACKEND=redis needs the redis package (pip install redis) - page cache disabled")
+            return None
+    if name not in ('none', 'off', ''):
+        print(f"⚠️  Unknown PAGE_CACHE_BACKEND '{name}' - page cache disabled")
+    return None
+
+
+def add_page_tags(*tags):
+    """Declare what the page being rendered depends on"""
+    if 'page_cache_tags' in g:
+        g.page_cache_tags.update(tags)
+
+
+class PageCache:
+    """Tagged response cache on top of a backend"""
+
+    # Response headers kept with a cached page
+    STORED_HEADERS = ('Content-Type', 'Cache-Control', 'Content-Language')
+
+    def __init__(self, backend, ttl=DEFAULT_TTL, site_url=None):
+        self.backend = backend
+        self.ttl = ttl
+        # Scheme and host pages are cached for ('https://example.com'), None for any
+        self.site_url = site_url.rstrip('/') if site_url else None
+
+    @property
+    def enabled(self):
+        return self.backend is not None
+
+    def cached(self, view=None, query_args=()):
+        """
+        Decorator caching a view's 200 responses for anonymous GET requests.
+        query_args names the query string arguments the view reads (like 'page') -
+        the only ones that are part of the cache key.
+        """
+        if view is None:
+            return lambda view: self.cached(view, query_args)
+
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not self.enabled or not self._cacheable_request():
+                return view(*args, **kwargs)
+
+            key = self._key(query_args)
+            try:
+                hit = self._load(key)
+            except Exception as e:
+                print(f"⚠️  Page cache read failed: {e}")
+                return view(*args, **kwargs)
+            if hit is not None:
+                return hit
+
+            # A purge while this page renders must win over storing what was rendered
+            generation = self.backend.get('generation')
+            g.page_cache_tags = set()
+            response = make_response(view(*args, **kwargs))
+            if self._cacheable_response(response):
+                try:
+                    self._store(key, response, g.page_cache_tags, generation)
+                    response.headers['X-Page-Cache'] = 'MISS'
+                except Exception as e:
+                    print(f"⚠️  Page cache write failed: {e}")
+            return response
+        return wrapper
+
+    def purge(self, *tags):
+        """Invalidate every page tagged with any of tags"""
+        if not self.enabled or not tags:
+            return
+        self.backend.incr('generation')
+        for tag in set(tags):
+            self.backend.incr('tag:' + tag)
+
+    def version(self, tag):
+        """Current version of tag - it changes every time the tag is purged"""
+        if not self.enabled:
+            return None
+        return self.backend.get('tag:' + tag) or 0
+
+    def purge_if_changed(self, tag, fingerprint):
+        """Purge tag when fingerprint differs from the one seen at the previous call"""
+        if not self.enabled:
+            return
+        fingerprint = hashlib.sha1(repr(fingerprint).encode('utf-8')).hexdigest()
+        if self.backend.get('fingerprint:' + tag) != fingerprint:
+            self.purge(tag)
+            self.backend.set('fingerprint:' + tag, fingerprint)
+
+    def clear(self):
+        if self.enabled:
+            self.backend.clear()
+
+    def _key(self, query_args):
+        """Scheme, host, path and the query arguments the view reads"""
+        query = urlencode([(name, value) for name in sorted(query_args) for value in request.args.getlist(name)])
+        return 'page:' + request.base_url + ('?' + query if query else '')
+
+    def _cacheable_request(self):
+        if request.method != 'GET':
+            return False
+        if self.site_url and request.host_url.rstrip('/') != self.site_url:
+            return False
+        # Logged in admins may see drafts and admin links - never cache or serve their pages
+        return not session.get('admin_logged_in')
+
+    def _cacheable_response(self, response):
+        return (
+            response.status_code == 200
+            and not response.direct_passthrough
+            and not response.is_streamed
+            and 'Set-Cookie' not in response.headers
+        )
+
+    def _load(self, key):
+        entry = self.backend.get(key)
+        if entry is None:
+            return None
+        tags = list(entry['tags'])
+        if tags:
+            current = self.backend.get_many(['tag:' + tag for tag in tags])
+            if any((version or 0) != entry['tags'][tag] for tag, version in zip(tags, current)):
+                return None
+        response = Response(entry['body'], status=entry['status'], headers=entry['headers'])
+        response.headers['X-Page-Cache'] = 'HIT'
+        return response
+
+    def _store(self, key, response, tags, generation):
+        tags = sorted(tags)
+        versions = self.backend.get_many(['tag:' + tag for tag in tags]) if tags else []
+        if self.backend.get('generation') != generation:
+            return
+        self.backend.set(key, {
+            'body': response.get_data(as_text=True),
+            'status': response.status_code,
+            'headers': [(name, response.headers[name]) for name in self.STORED_HEADERS if name in response.headers],
+            'tags': {tag: version or 0 for tag, version in zip(tags, versions)},
+        }, self.ttl)
@@ -0,0 +1,33 @@
+"""
+Post change notifications - lets in-process indexes and caches follow admin edits
+"""
+
+_listeners = []
+
+
+def on_post_change(listener):
+    """
+    Register a listener called after a post is created, edited, deleted or has its status toggled.
+
+    The listener receives (post_id, post, reordered, previous_categories). post is None
+    when the post was deleted; reordered is False when an edit kept the post's status and
+    published date, i.e. date ordered listings still hold the same posts in the same order.
+    previous_categories holds the slugs of the categories the post was in before the
+    change - after a delete or a category edit, listings the post is no longer part of.
+    Can be used as a decorator.
+    """
+    _listeners.append(listener)
+    return listener
+
+
+def notify_post_change(post_id, post=None, reordered=True, previous_categories=()):
+    """
+    Run every registered listener - call this after the database commit succeeded, with
+    the category slugs read before the post was edited or deleted
+    """
+    for listener in _listeners:
+        try:
+            listener(post_id, post, reordered, tuple(previous_categories))
+        except Exception as e:
+            # A stale cache must never break the admin request that saved the post
+            print(f"⚠️  Post change listener {getattr(listener, '__name__', listener)} failed: {e}")
@@ -0,0 +1,115 @@
+"""
+Next/previous post links from an in-memory map of published posts
+
+Published posts are kept sorted by (published_date, id), so the neighbours of
+any post are a binary search away instead of two range queries per page view.
+Drafts are never part of the map and never show up as a neighbour.
+"""
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+
+
+class Neighbor:
+    """The fields post.html shows for a next/previous link"""
+    __slots__ = ('id', 'slug', 'title', 'published_date')
+
+    def __init__(self, id, slug, title, published_date):
+        self.id = id
+        self.slug = slug
+        self.title = title
+        self.published_date = published_date
+
+
+class NeighborMap:
+    """
+    Thread-safe ordering of published posts.
+
+    A map built from another version of the data, or older than max_age seconds,
+    reports is_current() False so the caller rebuilds it - that is how workers
+    that did not handle an admin edit catch up.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys = []     # sorted (published_date, post id)
+        self._posts = {}    # post id -> Neighbor
+        self.is_built = False
+        self.version = None
+        self.built_at = 0
+
+    def build(self, rows, version=None):
+        """(Re)build from (id, slug, title, published_date) rows of every published post"""
+        posts = {row[0]: Neighbor(*row) for row in rows}
+        keys = sorted((post.published_date, post.id) for post in posts.values())
+        with self._lock:
+            self._posts = posts
+            self._keys = keys
+            self.version = version
+            self.built_at = time.time()
+            self.is_built = True
+
+    def is_current(self, version=None, max_age=None):
+        if not self.is_built or version != self.version:
+            return False
+        # None never expires; 0 is always stale, like a ttl of 0 in context_cache
+        return max_age is None or time.time() - self.built_at < max_age
+
+    def advance_version(self, old_version, new_version):
+        """Move a map built at old_version to new_version - for a change the caller applies incrementally"""
+        with self._lock:
+            if self.is_built and self.version == old_version:
+                self.version = new_version
+
+    def neighbors(self, post_id, published_date):
+        """(next, previous) published post around a post - newer and older, like the date ordered listings"""
+        key = (published_date, post_id)
+        with self._lock:
+            newer = bisect_right(self._keys, key)
+            older = bisect_left(self._keys, key) - 1
+            next_post = self._posts[self._keys[newer][1]] if newer < len(self._keys) else None
+            prev_post = self._posts[self._keys[older][1]] if older >= 0 else None
+        return next_post, prev_post
+
+    def update_post(self, post_id, slug, title, published_date, published=True):
+        """
+        Apply a publish, unpublish or edit. Returns the ids of the posts whose
+        links changed - the neighbours around the old and the new position.
+        """
+        with self._lock:
+            affected = self._remove(post_id)
+            if published:
+                key = (published_date, post_id)
+                insort(self._keys, key)
+                self._posts[post_id] = Neighbor(post_id, slug, title, published_date)
+                affected |= self._around(key)
+        affected.discard(post_id)
+        return affected
+
+    def remove_post(self, post_id):
+        """Drop a deleted or unpublished post; returns the ids of its former neighbours"""
+        with self._lock:
+            return self._remove(post_id)
+
+    def _around(self, key):
+        position = bisect_left(self._keys, key)
+        ids = set()
+        if position > 0:
+            ids.add(self._keys[position - 1][1])
+        end = position + 1 if position < len(self._keys) and self._keys[position] == key else position
+        if end < len(self._keys):
+            ids.add(self._keys[end][1])
+        return ids
+
+    def _remove(self, post_id):
+        post = self._posts.pop(post_id, None)
+        if post is None:
+            return set()
+        key = (post.published_date, post_id)
+        position = bisect_left(self._keys, key)
+        if position < len(self._keys) and self._keys[position] == key:
+            del self._keys[position]
+        return self._around(key)
+
+
+neighbor_map = NeighborMap()
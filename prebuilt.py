@@ -0,0 +1,210 @@
+"""
+Prebuilt sitemap and feed documents
+
+Crawlers and feed readers request /sitemap.xml and /feed.xml far more often than
+posts change. Each registered document is rendered once per site url, written
+atomically to a file together with the version it was built from, and the views
+serve the stored bytes. After a post change the documents are rebuilt on a
+background thread; until the new file replaces the old one requests keep getting
+the previous bytes - together with the version they were built from, so the
+views can hand out validators that match them. A file whose version no longer
+matches (changed by another worker or a script) is served once more and rebuilt
+the same way. Files also record the source they were built from - a file written
+for another database sharing the directory is never served, only rebuilt.
+
+With a configured site url every request is answered with the documents of that
+url, whatever its Host header. Without one, documents are stored for at most
+MAX_SITES url roots; requests for further hosts get None and are rendered live.
+
+Rebuilds are single-flight: one background rebuild per process at a time, started
+after a short delay so a burst of publishes collapses into one rebuild, plus at
+most one follow-up for changes that arrive while it runs. Across workers a lock
+file (fcntl, where available) serialises builds, and a worker that waited finds
+the documents already current and skips them.
+"""
+import hashlib
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+from flask import request
+
+from utils import write_atomic
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # Windows - builds are then single-flight within a process only
+
+REBUILD_DELAY = 1.0  # Seconds a background rebuild waits for more changes before starting
+MAX_SITES = 4  # Url roots stored when no site url is configured (http/https, www or not)
+
+
+class PrebuiltDocuments:
+    """Documents rendered ahead of requests and stored under directory, one subdirectory per site url"""
+
+    def __init__(self, directory, enabled=True, delay=REBUILD_DELAY, site_url=None, max_sites=MAX_SITES, source=''):
+        self.directory = directory
+        # Identifies the data documents are built from (the database) - files of another are rebuilt, never served
+        self.source = source
+        self.enabled = enabled
+        self.delay = delay
+        # Url root every document is built for ('https://example.com/'), None for the request's
+        self.site_url = site_url.rstrip('/') + '/' if site_url else None
+        self.max_sites = max_sites
+        self.app = None
+        self._documents = {}
+        self._sites = set()
+        self._build_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._running = False
+        self._pending = False
+
+    def init_app(self, app):
+        self.app = app
+
+    def document(self, name, version):
+        """
+        Decorator registering the builder of document name. The builder renders it for
+        the current request's url root and returns bytes; version() returns the string
+        a stored copy must match to be current.
+        """
+        def decorator(build):
+            self._documents[name] = (build, version)
+            return build
+        return decorator
+
+    def get(self, name):
+        """
+        (bytes, stale version) of document name, built first if missing. stale version
+        is None when the bytes are current, else the version they were built from, served
+        while a rebuild is pending. None when the request's host gets no stored documents.
+        """
+        build, version = self._documents[name]
+        site_url = self.site_url or request.url_root
+        site_dir = self._site_directory(site_url)
+        if site_dir is None:
+            return None
+        current = version()
+        stored = self._read(site_dir, name)
+        if stored is None:
+            # First request for this site url - built once, concurrent requests wait for it
+            with self._locked(site_dir):
+                stored = self._read(site_dir, name)
+                if stored is None:
+                    with self._site_context(site_url):
+                        data = build()
+                    self._write(site_dir, name, current, data)
+                    return data, None
+        stored_version, data = stored
+        if stored_version == current:
+            return data, None
+        self.schedule()
+        return data, stored_version
+
+    def schedule(self):
+        """Rebuild stale documents in the background; returns False if a rebuild was already queued"""
+        if not self.enabled or self.app is None:
+            return False
+        with self._state_lock:
+            if self._running:
+                self._pending = True
+                return False
+            self._running = True
+        threading.Thread(target=self._rebuild_loop, name='prebuilt-documents', daemon=True).start()
+        return True
+
+    def rebuild(self):
+        """Bring every stored document of every site url up to date; returns the number rebuilt"""
+        rebuilt = 0
+        for site_url, site_dir in self._stored_sites():
+            with self._site_context(site_url), self._locked(site_dir):
+                for name, (build, version) in self._documents.items():
+                    current = version()
+                    stored = self._read(site_dir, name)
+                    if stored is not None and stored[0] == current:
+                        continue
+                    self._write(site_dir, name, current, build())
+                    rebuilt += 1
+        return rebuilt
+
+    def _rebuild_loop(self):
+        while True:
+            time.sleep(self.delay)
+            with self._state_lock:
+                # Changes up to here are covered by this rebuild
+                self._pending = False
+            try:
+                self.rebuild()
+            except Exception as e:
+                print(f"⚠️  Rebuilding prebuilt documents failed: {e}")
+            with self._state_lock:
+                if not self._pending:
+                    self._running = False
+                    return
+
+    def _site_context(self, site_url):
+        """Request context whose url root is site_url, for building outside (or for another host than) the request"""
+        if request and request.url_root == site_url:
+            return nullcontext()
+        return self.app.test_request_context('/', base_url=site_url)
+
+    def _site_directory(self, site_url):
+        """Directory of a site url's documents, None past max_sites url roots"""
+        site_dir = os.path.join(self.directory, hashlib.sha1(site_url.encode('utf-8')).hexdigest()[:16])
+        if site_url not in self._sites:
+            if not self.site_url and not os.path.isdir(site_dir) and len(self._stored_sites()) >= self.max_sites:
+                return None
+            os.makedirs(site_dir, exist_ok=True)
+            write_atomic(os.path.join(site_dir, 'site_url'), site_url.encode('utf-8'))
+            self._sites.add(site_url)
+        return site_dir
+
+    def _stored_sites(self):
+        """(site url, directory) of every site url documents were requested for, by any worker"""
+        if self.site_url:
+            return [(self.site_url, self._site_directory(self.site_url))]
+        try:
+            names = sorted(os.listdir(self.directory))
+        except OSError:
+            return []
+        sites = []
+        for name in names:
+            try:
+                with open(os.path.join(self.directory, name, 'site_url'), 'r', encoding='utf-8') as f:
+                    sites.append((f.read(), os.path.join(self.directory, name)))
+            except OSError:
+                continue
+        return sites
+
+    @contextmanager
+    def _locked(self, site_dir):
+        with self._build_lock:
+            if fcntl is None:
+                yield
+                return
+            with open(os.path.join(site_dir, '.lock'), 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read(self, site_dir, name):
+        """(version, bytes) of a stored document, or None - also for one built from another source"""
+        try:
+            with open(os.path.join(site_dir, name), 'rb') as f:
+                content = f.read()
+        except OSError:
+            return None
+        header, _, data = content.partition(b'\n')
+        source, _, version = header.decode('utf-8').rpartition(' ')
+        if source != self.source:
+            return None
+        return version, data
+
+    def _write(self, site_dir, name, version, data):
+        # Source, version and document share one file, so a reader never pairs one with the other's predecessor
+        header = f'{self.source} {version}'.encode('utf-8')
+        write_atomic(os.path.join(site_dir, name), header + b'\n' + data)
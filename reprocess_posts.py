@@ -19,6 +19,8 @@ def reprocess_all_posts():
                 
                 # Update the post
                 post.content = processed_content
+                post.update_searchable_text()
+                post.update_render_artifacts()
                 db.session.commit()
                 
                 updated += 1
@@ -0,0 +1,215 @@
+"""
+Database-native full-text search backends (SQLite FTS5 / MySQL FULLTEXT)
+
+Enabled with SEARCH_BACKEND=database. The engine is picked from the dialect of
+DATABASE_URL, and both keep a `post_search` side table holding the indexed
+title, excerpt and searchable body of every published post. Matching, ranking
+and pagination run as one SQL query.
+
+Rebuild the side table: python search_fts.py
+"""
+import sqlalchemy as sa
+from sqlalchemy import text, func
+from sqlalchemy.orm import defer
+from flask_sqlalchemy.pagination import Pagination
+
+from search_index import tokenize, post_document
+
+SEARCH_TABLE = 'post_search'
+
+
+class RowsPagination(Pagination):
+    """
+    Paginate a query whose rows are (Post, total) - the total comes from
+    COUNT(*) OVER () so the page and the count share a single round trip.
+    Pass query=... as keyword argument.
+    """
+
+    def _query_items(self):
+        query = self._query_args['query']
+        rows = query.limit(self.per_page).offset(self._query_offset).all()
+        if rows:
+            self._total = rows[0][1]
+        else:
+            # Past the last page there is no row to carry the total
+            self._total = query.order_by(None).count() if self.page > 1 else 0
+        return [row[0] for row in rows]
+
+    def _query_count(self):
+        return self._total
+
+
+class FullTextBackend:
+    """Shared logic - subclasses provide the dialect specific SQL"""
+
+    key_column = None  # Column of the side table holding the post id
+
+    def __init__(self, db, Post):
+        self.db = db
+        self.Post = Post
+
+    def create_schema(self):
+        raise NotImplementedError
+
+    def match_subquery(self, query):
+        """
+        Return a subquery with (post_id, score) for every matching row - higher
+        score is better - or None if the query has nothing to match
+        """
+        raise NotImplementedError
+
+    def ensure_ready(self):
+        """Create the side table and fill it the first time it is used"""
+        self.create_schema()
+        indexed = self.db.session.execute(text(f'SELECT COUNT(*) FROM {SEARCH_TABLE}')).scalar()
+        if not indexed and self.Post.query.filter_by(status='published').count():
+            self.rebuild()
+
+    def rebuild(self):
+        """Re-index every published post"""
+        self.db.session.execute(text(f'DELETE FROM {SEARCH_TABLE}'))
+        posts = self.Post.query.filter_by(status='published').options(defer(self.Post.content))
+        for post in posts.all():
+            self._insert(post)
+        self.db.session.commit()
+
+    def index_post(self, post):
+        """Add or refresh one post - unpublished posts are removed"""
+        self._delete(post.id)
+        if post.status == 'published':
+            self._insert(post)
+        self.db.session.commit()
+
+    def remove_post(self, post_id):
+        self._delete(post_id)
+        self.db.session.commit()
+
+    def search(self, query, page=1, per_page=10, options=()):
+        """Paginated published posts matching query, best match first - options are loader options for Post"""
+        Post = self.Post
+        matches = self.match_subquery(query)
+        if matches is None:
+            rows = self.db.session.query(Post, sa.literal(0)).filter(sa.false())
+        else:
+            rows = self.db.session.query(Post, func.count().over()).options(*options).join(
+                matches, matches.c.post_id == Post.id
+            ).filter(
+                Post.status == 'published'
+            ).order_by(matches.c.score.desc(), Post.id.desc())
+        return RowsPagination(query=rows, page=page, per_page=per_page, error_out=False)
+
+    def search_ids(self, query):
+        """Ids of all published posts matching query, best match first"""
+        Post = self.Post
+        matches = self.match_subquery(query)
+        if matches is None:
+            return []
+        rows = self.db.session.query(Post.id).join(
+            matches, matches.c.post_id == Post.id
+        ).filter(
+            Post.status == 'published'
+        ).order_by(matches.c.score.desc(), Post.id.desc())
+        return [row[0] for row in rows]
+
+    def _insert(self, post):
+        document = post_document(post)
+        self.db.session.execute(
+            text(f'INSERT INTO {SEARCH_TABLE} ({self.key_column}, title, excerpt, body) '
+                 'VALUES (:post_id, :title, :excerpt, :body)'),
+            {'post_id': post.id, **document}
+        )
+
+    def _delete(self, post_id):
+        self.db.session.execute(
+            text(f'DELETE FROM {SEARCH_TABLE} WHERE {self.key_column} = :post_id'),
+            {'post_id': post_id}
+        )
+
+
+class SQLiteFTSBackend(FullTextBackend):
+    """FTS5 virtual table, rowid = post id, ranked with bm25()"""
+
+    key_column = 'rowid'
+
+    def create_schema(self):
+        self.db.session.execute(text(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(title, excerpt, body)'
+        ))
+        self.db.session.commit()
+
+    def match_subquery(self, query):
+        terms = tokenize(query)
+        if not terms:
+            return None
+        # Quoted terms are implicitly ANDed; the last one also matches as a prefix
+        match = ' '.join(f'"{term}"' for term in terms) + '*'
+        # bm25() is lower-is-better; weights follow search_index.FIELD_WEIGHTS
+        return text(
+            f'SELECT rowid AS post_id, -bm25({SEARCH_TABLE}, 3.0, 2.0, 1.0) AS score '
+            f'FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :match'
+        ).bindparams(match=match).columns(
+            sa.column('post_id', sa.Integer), sa.column('score', sa.Float)
+        ).subquery('matches')
+
+
+class MySQLFulltextBackend(FullTextBackend):
+    """InnoDB table with a FULLTEXT key, matched in boolean mode"""
+
+    key_column = 'post_id'
+
+    # InnoDB ignores tokens shorter than innodb_ft_min_token_size (3 by default)
+    MIN_TOKEN_SIZE = 3
+    # INFORMATION_SCHEMA.INNODB_FT_DEFAULT_STOPWORD - never indexed, so a required
+    # +stopword would make MATCH return no rows ("how to use python")
+    STOPWORDS = frozenset((
+        'a', 'about', 'an', 'are', 'as', 'at', 'be', 'by', 'com', 'de', 'en', 'for', 'from', 'how',
+        'i', 'in', 'is', 'it', 'la', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'was', 'what',
+        'when', 'where', 'who', 'will', 'with', 'und', 'www',
+    ))
+
+    def create_schema(self):
+        self.db.session.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} (
+                post_id INT PRIMARY KEY,
+                title VARCHAR(500),
+                excerpt TEXT,
+                body MEDIUMTEXT,
+                FULLTEXT KEY ft_{SEARCH_TABLE} (title, excerpt, body)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """))
+        self.db.session.commit()
+
+    def match_subquery(self, query):
+        terms = [term for term in tokenize(query) if len(term) >= self.MIN_TOKEN_SIZE and term not in self.STOPWORDS]
+        if not terms:
+            return None
+        match = ' '.join(f'+{term}' for term in terms) + '*'
+        return text(
+            'SELECT post_id, MATCH (title, excerpt, body) AGAINST (:match IN BOOLEAN MODE) AS score '
+            f'FROM {SEARCH_TABLE} WHERE MATCH (title, excerpt, body) AGAINST (:match IN BOOLEAN MODE)'
+        ).bindparams(match=match).columns(
+            sa.column('post_id', sa.Integer), sa.column('score', sa.Float)
+        ).subquery('matches')
+
+
+def create_fulltext_backend(db, Post):
+    """Pick the full-text backend for the configured database, or None if unsupported"""
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        return SQLiteFTSBackend(db, Post)
+    if dialect == 'mysql':
+        return MySQLFulltextBackend(db, Post)
+    return None
+
+
+if __name__ == '__main__':
+    from app import app, db, Post
+
+    with app.app_context():
+        backend = create_fulltext_backend(db, Post)
+        if backend is None:
+            print(f"❌ No full-text backend for dialect '{db.engine.dialect.name}'")
+        else:
+            backend.create_schema()
+            backend.rebuild()
+            print(f"✅ Rebuilt {SEARCH_TABLE} with {type(backend).__name__}")
@@ -0,0 +1,431 @@
+"""
+In-process inverted index for full-text search over published posts
+
+Postings are kept per term with BM25 ranking, so a query only touches the posts
+that actually contain its terms instead of scanning every post body.
+"""
+import html
+import math
+import re
+import threading
+from bisect import bisect_left
+from collections import Counter
+
+from flask_sqlalchemy.pagination import Pagination
+from markupsafe import Markup, escape
+
+from utils import extract_searchable_content
+
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+# Term frequencies are multiplied by the field weight, so a title hit counts
+# like three body hits (a simple BM25F approximation)
+FIELD_WEIGHTS = {
+    'title': 3.0,
+    'excerpt': 2.0,
+    'body': 1.0,
+}
+
+# The last query term also matches longer terms starting with it ("pyth" -> "python")
+MIN_PREFIX_LENGTH = 3
+
+# Typo tolerance: query terms without an exact match are replaced by indexed
+# terms sharing character trigrams and within a small edit distance
+MIN_FUZZY_LENGTH = 4
+FUZZY_CANDIDATES = 64   # Terms with the most shared trigrams that get an edit distance check
+FUZZY_EXPANSIONS = 5    # Corrections kept per query term
+
+# Snippets: body offsets kept per term and post, and the snippet length in characters
+MAX_TERM_OFFSETS = 3
+SNIPPET_LENGTH = 160
+SNIPPET_LEAD = 40       # Context shown before the first highlighted term
+
+# Character references left in the stored searchable text (&rsquo;, &#39;, &amp;)
+CHARREF_PATTERN = re.compile(r'&(?:#[0-9]+|#[xX][0-9a-fA-F]+|[A-Za-z][A-Za-z0-9]*);')
+
+
+def tokenize(text):
+    """Split text into lowercase word tokens"""
+    if not text:
+        return []
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def post_document(post):
+    """Return the fields that get indexed for a post"""
+    body = post.searchable_text
+    if body is None:
+        # Not backfilled yet (python backfill_searchable_text.py)
+        body = extract_searchable_content(post.content)
+    elif '&' in body:
+        # Stored before character references were decoded - &amp; must not index as "amp"
+        body = html.unescape(body)
+    return {
+        'title': post.title or '',
+        'excerpt': post.excerpt or '',
+        'body': body,
+    }
+
+
+def trigrams(term):
+    """Character trigrams of a term, padded so word starts and ends count ("  p", " py", ...)"""
+    padded = f'  {term} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, max_distance):
+    """
+    Levenshtein distance with adjacent transpositions ("pyhton" -> "python" is 1).
+    Returns max_distance + 1 as soon as the distance is known to exceed max_distance.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, char_b in enumerate(b, 1):
+            cost = 0 if char_a == char_b else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous_previous is not None and i > 1 and j > 1
+                    and char_a == b[j - 2] and a[i - 2] == char_b):
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+
+class TrigramIndex:
+    """Trigram -> vocabulary terms, so a misspelled term only looks at terms that look alike"""
+
+    def __init__(self):
+        self._terms_by_trigram = {}
+
+    def add(self, term):
+        for gram in trigrams(term):
+            self._terms_by_trigram.setdefault(gram, set()).add(term)
+
+    def remove(self, term):
+        for gram in trigrams(term):
+            terms = self._terms_by_trigram.get(gram)
+            if terms is not None:
+                terms.discard(term)
+                if not terms:
+                    del self._terms_by_trigram[gram]
+
+    def similar_terms(self, term):
+        """[(indexed term, similarity)] for likely corrections of term, most similar first"""
+        if len(term) < MIN_FUZZY_LENGTH:
+            return []
+        shared = Counter()
+        for gram in trigrams(term):
+            for candidate in self._terms_by_trigram.get(gram, ()):
+                shared[candidate] += 1
+
+        max_distance = 1 if len(term) <= 5 else 2
+        matches = []
+        for candidate, _ in shared.most_common(FUZZY_CANDIDATES):
+            distance = edit_distance(term, candidate, max_distance)
+            if distance <= max_distance:
+                matches.append((candidate, 1 - distance / max(len(term), len(candidate))))
+        matches.sort(key=lambda match: (-match[1], match[0]))
+        return matches[:FUZZY_EXPANSIONS]
+
+
+def find_term_offsets(text, terms):
+    """Offsets of words in text that start with one of terms - used when no index offsets are stored"""
+    if not text or not terms:
+        return []
+    pattern = re.compile(r'(?<!\w)(?:' + '|'.join(map(re.escape, terms)) + ')', re.IGNORECASE)
+    return [match.start() for match in pattern.finditer(text)][:MAX_TERM_OFFSETS * len(terms)]
+
+
+def unescape_with_offsets(text, offsets):
+    """
+    Text with its character references decoded, and offsets into it moved to the
+    same characters of the decoded text
+    """
+    parts, shifts, position, removed = [], [], 0, 0
+    for match in CHARREF_PATTERN.finditer(text):
+        decoded = html.unescape(match.group())
+        parts.append(text[position:match.start()])
+        parts.append(decoded)
+        position = match.end()
+        removed += len(match.group()) - len(decoded)
+        shifts.append((match.end(), removed))
+    if not shifts:
+        return text, offsets
+    parts.append(text[position:])
+    ends = [end for end, _ in shifts]
+    moved = []
+    for offset in offsets:
+        before = bisect_left(ends, offset + 1)  # References that end at or before offset
+        moved.append(offset - (shifts[before - 1][1] if before else 0))
+    return ''.join(parts), moved
+
+
+def build_snippet(text, terms, offsets):
+    """
+    Cut a plain text snippet around the densest cluster of match offsets and wrap
+    the matched words in <mark>. Returns escaped, template-safe Markup.
+    """
+    if not text:
+        return Markup('')
+    # The stored text keeps character references; decode them so they are escaped once, below
+    text, offsets = unescape_with_offsets(text, offsets)
+
+    start = 0
+    if offsets:
+        offsets = sorted(offsets)
+        best_count = 0
+        span = SNIPPET_LENGTH - SNIPPET_LEAD
+        for i, offset in enumerate(offsets):
+            count = bisect_left(offsets, offset + span, lo=i) - i
+            if count > best_count:
+                best_count, start = count, offset
+        start = max(0, start - SNIPPET_LEAD)
+        if start:
+            # Don't cut a word in half
+            space = text.find(' ', start)
+            start = space + 1 if 0 <= space < start + SNIPPET_LEAD else start
+
+    end = start + SNIPPET_LENGTH
+    if end < len(text):
+        space = text.rfind(' ', start, end)
+        end = space if space > start else end
+    snippet = text[start:end]
+
+    # Matches are found on the plain text and every piece escaped on its own, so a
+    # term like "amp" or "lt" can never land inside an escaped character reference
+    html_parts = []
+    position = 0
+    if terms:
+        pattern = re.compile(r'(?<!\w)((?:' + '|'.join(map(re.escape, terms)) + r')\w*)', re.IGNORECASE)
+        for match in pattern.finditer(snippet):
+            html_parts.append(escape(snippet[position:match.start()]))
+            html_parts.append(Markup('<mark>%s</mark>') % match.group(1))
+            position = match.end()
+    html_parts.append(escape(snippet[position:]))
+    result = Markup('').join(html_parts)
+    if start > 0:
+        result = Markup('&hellip;') + result
+    if end < len(text):
+        result = result + Markup('&hellip;')
+    return result
+
+
+class SearchIndex:
+    """Thread-safe BM25 inverted index keyed by post id"""
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._postings = {}      # term -> {post_id: weighted term frequency}
+        self._doc_terms = {}     # post_id -> terms of that post (needed to remove it)
+        self._doc_lengths = {}   # post_id -> weighted document length
+        self._body_offsets = {}  # post_id -> {term: first character offsets in the body}
+        self._total_length = 0.0
+        self._sorted_terms = None
+        self._trigrams = TrigramIndex()
+        self.is_built = False
+
+    def __len__(self):
+        return len(self._doc_lengths)
+
+    def build(self, posts):
+        """(Re)build the whole index from an iterable of published posts"""
+        with self._lock:
+            self._postings = {}
+            self._doc_terms = {}
+            self._doc_lengths = {}
+            self._body_offsets = {}
+            self._total_length = 0.0
+            self._sorted_terms = None
+            self._trigrams = TrigramIndex()
+            for post in posts:
+                self._add(post.id, post_document(post))
+            self.is_built = True
+
+    def index_post(self, post):
+        """Add or refresh a single post - unpublished posts are dropped from the index"""
+        if not self.is_built:
+            return  # The first search builds the index with this post included
+        with self._lock:
+            self._remove(post.id)
+            if post.status == 'published':
+                self._add(post.id, post_document(post))
+
+    def remove_post(self, post_id):
+        """Drop a post from the index"""
+        with self._lock:
+            self._remove(post_id)
+
+    def search(self, query, fuzzy=True):
+        """
+        Return ids of posts matching every query term, best BM25 score first.
+
+        With fuzzy=True, query terms that match nothing are corrected through the
+        trigram index and those matches are appended after the exact ones.
+        """
+        with self._lock:
+            doc_count = len(self._doc_lengths)
+            exact, corrected = self._expand_query(query, fuzzy)
+            if not doc_count or not exact:
+                return []
+            avg_length = self._total_length / doc_count
+
+            ranked = self._rank(exact, doc_count, avg_length)
+            if corrected is not None:
+                seen = set(ranked)
+                ranked += [post_id for post_id in self._rank(corrected, doc_count, avg_length)
+                           if post_id not in seen]
+        return ranked
+
+    def matched_terms(self, query, fuzzy=True):
+        """Indexed terms a query matches (exact, prefix and corrected) - used for highlighting"""
+        with self._lock:
+            exact, corrected = self._expand_query(query, fuzzy)
+        terms = []
+        for expansions in (corrected if corrected is not None else exact):
+            terms.extend(term for term, _ in expansions)
+        return list(dict.fromkeys(terms))
+
+    def snippet(self, post_id, body, terms):
+        """Highlighted snippet of a post body, positioned from the stored term offsets"""
+        with self._lock:
+            stored = self._body_offsets.get(post_id, {})
+            offsets = [offset for term in terms for offset in stored.get(term, ())]
+        return build_snippet(body, terms, offsets)
+
+    def _expand_query(self, query, fuzzy):
+        """
+        Per query term, the (indexed term, weight) pairs it matches exactly, plus the
+        corrected expansions when fuzzy matching applies (None otherwise)
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        exact = []
+        for position, term in enumerate(terms):
+            expansions = [term]
+            if position == len(terms) - 1 and len(term) >= MIN_PREFIX_LENGTH:
+                expansions = self._terms_with_prefix(term)
+            exact.append([(expanded, 1.0) for expanded in expansions if expanded in self._postings])
+
+        corrected = None
+        if fuzzy and exact and not all(exact):
+            corrected = [expansions or self._trigrams.similar_terms(term)
+                         for term, expansions in zip(terms, exact)]
+        return exact, corrected
+
+    def _rank(self, expansions_per_term, doc_count, avg_length):
+        """Post ids matching every term (any of its weighted expansions), best score first"""
+        scores = None
+        for expansions in expansions_per_term:
+            term_scores = self._score_term(expansions, doc_count, avg_length)
+            if scores is None:
+                scores = term_scores
+            else:
+                # Every query term has to match (AND semantics)
+                scores = {post_id: score + term_scores[post_id]
+                          for post_id, score in scores.items() if post_id in term_scores}
+            if not scores:
+                return []
+        # Ties go to the newest post (highest id)
+        return [post_id for post_id, _ in sorted(scores.items(), key=lambda item: (-item[1], -item[0]))]
+
+    def _score_term(self, expansions, doc_count, avg_length):
+        """BM25 contribution of one query term - expansions are (indexed term, weight) pairs"""
+        scores = {}
+        for expanded, weight in expansions:
+            postings = self._postings.get(expanded)
+            if not postings:
+                continue
+            df = len(postings)
+            idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+            for post_id, tf in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[post_id] / avg_length)
+                scores[post_id] = scores.get(post_id, 0.0) + weight * idf * tf * (self.k1 + 1) / (tf + norm)
+        return scores
+
+    def _terms_with_prefix(self, prefix):
+        """All indexed terms starting with prefix (the exact term included)"""
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self._postings)
+        matches = []
+        start = bisect_left(self._sorted_terms, prefix)
+        for term in self._sorted_terms[start:]:
+            if not term.startswith(prefix):
+                break
+            matches.append(term)
+        return matches
+
+    def _add(self, post_id, fields):
+        frequencies = Counter()
+        for field, text in fields.items():
+            weight = FIELD_WEIGHTS[field]
+            for token in tokenize(text):
+                frequencies[token] += weight
+
+        # Where each term first shows up in the body, so snippets need no text scan
+        offsets = {}
+        for match in TOKEN_PATTERN.finditer(fields['body'].lower()):
+            positions = offsets.setdefault(match.group(), [])
+            if len(positions) < MAX_TERM_OFFSETS:
+                positions.append(match.start())
+        self._body_offsets[post_id] = {term: tuple(positions) for term, positions in offsets.items()}
+
+        for term, tf in frequencies.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                self._sorted_terms = None
+                self._trigrams.add(term)
+            postings[post_id] = tf
+
+        length = sum(frequencies.values())
+        self._doc_terms[post_id] = tuple(frequencies)
+        self._doc_lengths[post_id] = length
+        self._total_length += length
+
+    def _remove(self, post_id):
+        terms = self._doc_terms.pop(post_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(post_id, None)
+            if not postings:
+                del self._postings[term]
+                self._sorted_terms = None
+                self._trigrams.remove(term)
+        self._total_length -= self._doc_lengths.pop(post_id, 0.0)
+        self._body_offsets.pop(post_id, None)
+
+
+class IdListPagination(Pagination):
+    """
+    Paginate an already ranked list of post ids.
+
+    Only the ids of the requested page are loaded from the database, and they are
+    returned in ranking order. Pass ids=[...] and model=Post as keyword arguments,
+    plus optional options=[...] loader options for the page query.
+    """
+
+    def _query_items(self):
+        page_ids = self._query_args['ids'][self._query_offset:self._query_offset + self.per_page]
+        if not page_ids:
+            return []
+        model = self._query_args['model']
+        query = model.query.options(*self._query_args.get('options', ())).filter(model.id.in_(page_ids))
+        posts = {post.id: post for post in query.all()}
+        return [posts[post_id] for post_id in page_ids if post_id in posts]
+
+    def _query_count(self):
+        return len(self._query_args['ids'])
+
+
+# Shared index used by the public search routes
+search_index = SearchIndex()
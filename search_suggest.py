@@ -0,0 +1,140 @@
+"""
+In-memory typeahead suggestions for the header search box
+
+Post titles, category names and primary SEO keywords are kept in one sorted
+list of word-start keys, so a prefix lookup is a binary search plus a short scan.
+"""
+import threading
+from bisect import bisect_left, insort
+
+from search_index import tokenize
+
+# Suggestion types in display order
+TYPE_ORDER = {'category': 0, 'keyword': 1, 'post': 2}
+
+MAX_LIMIT = 10
+# Upper bound on keys examined per lookup, keeps short prefixes like "p" cheap
+MAX_SCAN = 200
+
+
+def label_keys(label):
+    """Lookup keys for a label - one per word start ("aws lambda guide", "lambda guide", "guide")"""
+    tokens = tokenize(label)
+    return [' '.join(tokens[i:]) for i in range(len(tokens))]
+
+
+class SuggestionIndex:
+    """
+    Thread-safe prefix index of suggestions.
+
+    Every suggestion is owned by the published posts it came from; a category or
+    keyword disappears once no published post refers to it anymore.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._keys = []          # sorted (key, entry id)
+        self._entries = {}       # entry id -> suggestion dict
+        self._owners = {}        # entry id -> ids of posts that contributed it
+        self._post_entries = {}  # post id -> entry ids it contributed
+        self.is_built = False
+
+    def build(self, posts):
+        """
+        (Re)build from dicts with post_id, title, slug, keyword and categories
+        (a list of (name, slug)) for every published post
+        """
+        with self._lock:
+            self._keys = []
+            self._entries = {}
+            self._owners = {}
+            self._post_entries = {}
+            for post in posts:
+                self._add_post(bulk=True, **post)
+            # Sorting once is much cheaper than an insort per key on a large catalog
+            self._keys.sort()
+            self.is_built = True
+
+    def index_post(self, post_id, title, slug, keyword=None, categories=(), published=True):
+        """Replace the suggestions contributed by one post"""
+        if not self.is_built:
+            return  # The first lookup builds the index with this post included
+        with self._lock:
+            self._remove_post(post_id)
+            if published:
+                self._add_post(post_id, title, slug, keyword, categories)
+
+    def remove_post(self, post_id):
+        with self._lock:
+            self._remove_post(post_id)
+
+    def suggest(self, prefix, limit=8):
+        """Best suggestions whose label has a word starting with prefix"""
+        prefix = ' '.join(tokenize(prefix))
+        if not prefix:
+            return []
+        limit = max(1, min(limit, MAX_LIMIT))
+
+        with self._lock:
+            ranked = {}
+            position = bisect_left(self._keys, (prefix,))
+            for key, entry_id in self._keys[position:position + MAX_SCAN]:
+                if not key.startswith(prefix):
+                    break
+                entry = self._entries[entry_id]
+                # Matches at the start of the label beat matches on a later word
+                rank = (
+                    0 if key == entry['key'] else 1,
+                    TYPE_ORDER[entry['type']],
+                    len(entry['label']),
+                    entry['label'].lower(),
+                )
+                if entry_id not in ranked or rank < ranked[entry_id][0]:
+                    ranked[entry_id] = (rank, entry)
+
+        best = sorted(ranked.values(), key=lambda item: item[0])[:limit]
+        return [{k: v for k, v in entry.items() if k != 'key'} for _, entry in best]
+
+    def _add_post(self, post_id, title, slug, keyword=None, categories=(), bulk=False):
+        entries = [(('post', post_id), {'type': 'post', 'label': title, 'slug': slug})]
+        if keyword and keyword.strip():
+            normalized = ' '.join(tokenize(keyword))
+            entries.append((('keyword', normalized), {'type': 'keyword', 'label': keyword.strip(), 'query': keyword.strip()}))
+        for name, category_slug in categories:
+            entries.append((('category', category_slug), {'type': 'category', 'label': name, 'slug': category_slug}))
+
+        owned = self._post_entries.setdefault(post_id, set())
+        for entry_id, entry in entries:
+            keys = label_keys(entry['label'])
+            if not keys:
+                continue
+            if entry_id not in self._entries:
+                entry['key'] = keys[0]
+                self._entries[entry_id] = entry
+                self._owners[entry_id] = set()
+                for key in keys:
+                    if bulk:
+                        self._keys.append((key, entry_id))
+                    else:
+                        insort(self._keys, (key, entry_id))
+            self._owners[entry_id].add(post_id)
+            owned.add(entry_id)
+
+    def _remove_post(self, post_id):
+        for entry_id in self._post_entries.pop(post_id, ()):
+            owners = self._owners.get(entry_id)
+            if owners is None:
+                continue
+            owners.discard(post_id)
+            if owners:
+                continue
+            del self._owners[entry_id]
+            entry = self._entries.pop(entry_id)
+            for key in label_keys(entry['label']):
+                position = bisect_left(self._keys, (key, entry_id))
+                if position < len(self._keys) and self._keys[position] == (key, entry_id):
+                    del self._keys[position]
+
+
+# Shared index used by /api/search/suggest
+suggestion_index = SuggestionIndex()
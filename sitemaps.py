@@ -0,0 +1,102 @@
+"""
+Streaming sitemaps (https://www.sitemaps.org/protocol.html)
+
+A sitemap may list at most 50,000 URLs and be at most 50 MB uncompressed, so
+large sites publish a sitemap index pointing at numbered child sitemaps. The
+documents here are generators: the views hand them to a streaming response
+and rows are fetched in chunks with keyset pagination on the primary key, so
+memory use stays flat however many posts there are.
+
+Child sitemaps can be sent gzip compressed (sitemap-*.xml.gz) - crawlers
+accept the compressed file itself, no Content-Encoding negotiation involved.
+"""
+import zlib
+from xml.sax.saxutils import escape
+
+# Protocol limit per sitemap file. The other limit, 50 MB, cannot be reached: slugs
+# are at most 500 characters, so a <url> entry stays well under 1 KB
+MAX_URLS = 50000
+# Rows fetched per query while streaming
+FETCH_SIZE = 1000
+
+URLSET_OPEN = '<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+URLSET_CLOSE = '</urlset>'
+INDEX_OPEN = '<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+INDEX_CLOSE = '</sitemapindex>'
+
+
+def format_lastmod(value):
+    """W3C date of a date or datetime, None when unknown"""
+    return value.strftime('%Y-%m-%d') if value else None
+
+
+def url_entry(loc, lastmod=None, changefreq=None, priority=None):
+    """One <url> element"""
+    parts = ['<url>', f'<loc>{escape(loc)}</loc>']
+    if lastmod:
+        parts.append(f'<lastmod>{format_lastmod(lastmod)}</lastmod>')
+    if changefreq:
+        parts.append(f'<changefreq>{changefreq}</changefreq>')
+    if priority is not None:
+        parts.append(f'<priority>{priority}</priority>')
+    parts.append('</url>')
+    return '\n'.join(parts) + '\n'
+
+
+def sitemap_entry(loc, lastmod=None):
+    """One <sitemap> element of a sitemap index"""
+    lastmod = f'<lastmod>{format_lastmod(lastmod)}</lastmod>\n' if lastmod else ''
+    return f'<sitemap>\n<loc>{escape(loc)}</loc>\n{lastmod}</sitemap>\n'
+
+
+def urlset(entries):
+    """Stream a <urlset> document from url_entry() strings"""
+    yield URLSET_OPEN
+    yield from entries
+    yield URLSET_CLOSE
+
+
+def sitemap_index(entries):
+    """Stream a <sitemapindex> document from sitemap_entry() strings"""
+    yield INDEX_OPEN
+    yield from entries
+    yield INDEX_CLOSE
+
+
+def encode(chunks, batch_size=64 * 1024):
+    """UTF-8 bytes of a document, sent in blocks of about batch_size instead of one write per element"""
+    buffer, size = [], 0
+    for chunk in chunks:
+        data = chunk.encode('utf-8')
+        buffer.append(data)
+        size += len(data)
+        if size >= batch_size:
+            yield b''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def gzip_stream(chunks, level=6):
+    """Gzip a stream of bytes on the fly - the header carries no timestamp, so equal input gives equal output"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def iter_chunked(query, key_column, size=FETCH_SIZE):
+    """
+    Rows of query in key_column order, fetched size rows at a time. key_column must
+    be unique and be the first column of each row (keyset pagination on it).
+    """
+    last = None
+    while True:
+        page = query if last is None else query.filter(key_column > last)
+        rows = page.order_by(key_column).limit(size).all()
+        yield from rows
+        if len(rows) < size:
+            return
+        last = rows[-1][0]
@@ -13,6 +13,7 @@
         initCodeCopyButtons();
         initSmoothScroll();
         initPrism();
+        initSearchSuggestions();
     });
 
     // Theme Toggle
@@ -340,6 +341,113 @@
         });
     }
 
+    // Search Suggestions (typeahead)
+    function initSearchSuggestions() {
+        const input = document.getElementById('search-input');
+        if (!input) return;
+        
+        const form = input.closest('form');
+        const list = document.createElement('ul');
+        list.className = 'search-suggestions';
+        list.setAttribute('role', 'listbox');
+        list.hidden = true;
+        form.appendChild(list);
+        input.setAttribute('aria-autocomplete', 'list');
+        
+        let debounceTimer = null;
+        let controller = null;
+        let activeIndex = -1;
+        
+        function hideSuggestions() {
+            list.hidden = true;
+            list.innerHTML = '';
+            activeIndex = -1;
+        }
+        
+        function setActive(index) {
+            const items = list.querySelectorAll('.search-suggestion');
+            items.forEach(item => item.classList.remove('active'));
+            activeIndex = index;
+            if (items[index]) {
+                items[index].classList.add('active');
+            }
+        }
+        
+        function renderSuggestions(suggestions) {
+            list.innerHTML = '';
+            activeIndex = -1;
+            if (!suggestions.length) {
+                list.hidden = true;
+                return;
+            }
+            suggestions.forEach(suggestion => {
+                const li = document.createElement('li');
+                li.setAttribute('role', 'option');
+                const a = document.createElement('a');
+                a.className = 'search-suggestion';
+                a.href = suggestion.url;
+                const label = document.createElement('span');
+                label.className = 'search-suggestion-label';
+                label.textContent = suggestion.label;
+                const type = document.createElement('span');
+                type.className = 'search-suggestion-type';
+                type.textContent = suggestion.type;
+                a.appendChild(label);
+                a.appendChild(type);
+                li.appendChild(a);
+                list.appendChild(li);
+            });
+            list.hidden = false;
+        }
+        
+        function fetchSuggestions() {
+            const query = input.value.trim();
+            if (query.length < 2) {
+                hideSuggestions();
+                return;
+            }
+            // Drop the response of the previous keystroke if it is still in flight
+            if (controller) controller.abort();
+            controller = new AbortController();
+            
+            fetch(`/api/search/suggest?q=${encodeURIComponent(query)}&limit=8`, { signal: controller.signal })
+                .then(response => response.json())
+                .then(data => renderSuggestions(data.suggestions || []))
+                .catch(error => {
+                    if (error.name !== 'AbortError') hideSuggestions();
+                });
+        }
+        
+        input.addEventListener('input', function() {
+            clearTimeout(debounceTimer);
+            debounceTimer = setTimeout(fetchSuggestions, 80);
+        });
+        
+        input.addEventListener('keydown', function(e) {
+            const items = list.querySelectorAll('.search-suggestion');
+            if (list.hidden || !items.length) return;
+            
+            if (e.key === 'ArrowDown') {
+                e.preventDefault();
+                setActive((activeIndex + 1) % items.length);
+            } else if (e.key === 'ArrowUp') {
+                e.preventDefault();
+                setActive(activeIndex <= 0 ? items.length - 1 : activeIndex - 1);
+            } else if (e.key === 'Enter' && activeIndex >= 0) {
+                e.preventDefault();
+                window.location.href = items[activeIndex].href;
+            } else if (e.key === 'Escape') {
+                hideSuggestions();
+            }
+        });
+        
+        document.addEventListener('click', function(e) {
+            if (!form.contains(e.target)) {
+                hideSuggestions();
+            }
+        });
+    }
+
     // Newsletter Form
     const newsletterForm = document.getElementById('newsletter-form');
     if (newsletterForm) {
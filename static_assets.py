@@ -0,0 +1,358 @@
+"""
+Content-hashed static assets
+
+CSS, JavaScript and images under static/ are copied to static/dist/ with a hash
+of their content in the file name (css/style.css -> dist/css/style.3f9c2a71d0.css),
+CSS and JavaScript minified, and gzip (plus brotli when the brotli package is
+installed) siblings written next to them. dist/manifest.json maps each source
+path to its fingerprinted file; url_for('static', filename='css/style.css')
+resolves through it, so a changed file gets a new URL and unchanged ones can be
+cached forever by browsers and CDNs.
+
+The app builds on startup (missing outputs only, every write atomic, so several
+workers can start at once). To build ahead of a deploy, or prune outdated files:
+
+    python static_assets.py
+    python static_assets.py --clean
+
+With fingerprinting turned off (STATIC_FINGERPRINT=false, for development) URLs
+point at the source files with ?v=<modification time>, so edits show up without a
+rebuild; files the manifest has no entry for get the same ?v= cache-buster.
+Minification only removes comments and whitespace; strings, template literals
+and regular expressions are copied as they are.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import sys
+
+from flask import request, send_from_directory
+
+from utils import write_atomic
+
+ASSET_DIRS = ('css', 'js', 'images')
+OUTPUT_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+HASH_LENGTH = 10
+# Text formats worth precompressing - images other than SVG are compressed already
+COMPRESSIBLE = ('.css', '.js', '.svg')
+MIN_COMPRESS_SIZE = 512
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# Characters after which a / starts a regular expression literal rather than a division
+JS_REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+JS_REGEX_KEYWORDS = ('return', 'typeof', 'case', 'delete', 'void', 'in', 'of', 'new', 'throw')
+CSS_TIGHT_CHARS = set('{};,')
+
+
+def _scan_quoted(source, i, quote):
+    """Index just past the string or template literal starting at source[i]"""
+    i += 1
+    while i < len(source):
+        char = source[i]
+        if char == '\\':
+            i += 2
+            continue
+        i += 1
+        if char == quote:
+            break
+    return i
+
+
+def _scan_regex(source, i):
+    """Index just past the regular expression literal (and its flags) starting at source[i]"""
+    i += 1
+    in_class = False
+    while i < len(source):
+        char = source[i]
+        if char == '\\':
+            i += 2
+            continue
+        if char == '\n':
+            break
+        i += 1
+        if char == '[':
+            in_class = True
+        elif char == ']':
+            in_class = False
+        elif char == '/' and not in_class:
+            break
+    while i < len(source) and (source[i].isalnum() or source[i] == '_'):
+        i += 1
+    return i
+
+
+def _regex_allowed(out):
+    """Whether a / following the minified output so far starts a regular expression"""
+    text = ''.join(out[-3:]).rstrip()
+    if not text:
+        return True
+    if text[-1] in JS_REGEX_PRECEDERS:
+        return True
+    word = re.search(r'[A-Za-z_$]+$', text)
+    return bool(word) and word.group() in JS_REGEX_KEYWORDS
+
+
+def _append_space(out, space):
+    """Add whitespace to the output, merged with whitespace already at its end - a line break wins"""
+    if out and out[-1] in (' ', '\n'):
+        out[-1] = '\n' if '\n' in (out[-1], space) else ' '
+    else:
+        out.append(space)
+
+
+def minify_js(source):
+    """JavaScript without comments, indentation and blank lines; line breaks are kept so ASI is unaffected"""
+    out = []
+    i, length = 0, len(source)
+    while i < length:
+        char = source[i]
+        if char in '\'"`':
+            end = _scan_quoted(source, i, char)
+            out.append(source[i:end])
+            i = end
+        elif source.startswith('//', i):
+            end = source.find('\n', i)
+            i = length if end == -1 else end
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            i = length if end == -1 else end + 2
+            _append_space(out, ' ')
+        elif char == '/' and _regex_allowed(out):
+            end = _scan_regex(source, i)
+            out.append(source[i:end])
+            i = end
+        elif char.isspace():
+            end = i
+            while end < length and source[end].isspace():
+                end += 1
+            _append_space(out, '\n' if '\n' in source[i:end] else ' ')
+            i = end
+        else:
+            end = i + 1
+            while end < length and not source[end].isspace() and source[end] not in '\'"`/':
+                end += 1
+            out.append(source[i:end])
+            i = end
+    return ''.join(out).strip() + '\n'
+
+
+def minify_css(source):
+    """CSS without comments and redundant whitespace; strings are copied as they are"""
+    out = []
+    i, length = 0, len(source)
+    while i < length:
+        char = source[i]
+        if char in '\'"':
+            end = _scan_quoted(source, i, char)
+            out.append(source[i:end])
+            i = end
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            i = length if end == -1 else end + 2
+        elif char.isspace():
+            while i < length and source[i].isspace():
+                i += 1
+            # Whitespace matters between words and before ':' (".a :hover"), not next to punctuation
+            if out and out[-1][-1:] not in CSS_TIGHT_CHARS | {':', ' '} and i < length and source[i] not in CSS_TIGHT_CHARS:
+                out.append(' ')
+        else:
+            if char in CSS_TIGHT_CHARS and out and out[-1] == ' ':
+                out.pop()
+            if char == '}' and out and out[-1] == ';':
+                out.pop()
+            out.append(char)
+            i += 1
+    return ''.join(out).strip() + '\n'
+
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+
+
+def _brotli_compress(data):
+    try:
+        import brotli  # Optional dependency, only needed for .br siblings
+    except ImportError:
+        return None
+    return brotli.compress(data, quality=11)
+
+
+class AssetPipeline:
+    """Builds fingerprinted assets and resolves static URLs through their manifest"""
+
+    def __init__(self, static_folder):
+        self.static_folder = static_folder
+        self.output_folder = os.path.join(static_folder, OUTPUT_DIR)
+        self.manifest = {}
+        self._fingerprinted = set()
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.output_folder, MANIFEST_NAME)
+
+    def sources(self):
+        """Paths of the assets to fingerprint, relative to the static folder"""
+        for directory in ASSET_DIRS:
+            root = os.path.join(self.static_folder, directory)
+            for current, _, names in os.walk(root):
+                for name in sorted(names):
+                    if not name.startswith('.'):
+                        path = os.path.join(current, name)
+                        yield os.path.relpath(path, self.static_folder).replace(os.sep, '/')
+
+    def build_asset(self, source):
+        """Write the fingerprinted file (and compressed siblings) for one source, returning its path"""
+        with open(os.path.join(self.static_folder, source), 'rb') as f:
+            data = f.read()
+        stem, ext = os.path.splitext(source)
+        minify = MINIFIERS.get(ext.lower())
+        if minify:
+            data = minify(data.decode('utf-8')).encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+        target = f'{OUTPUT_DIR}/{stem}.{digest}{ext}'
+        path = os.path.join(self.static_folder, target)
+
+        # The name is the content hash, so an existing file is already up to date
+        if not os.path.exists(path):
+            if ext.lower() in COMPRESSIBLE and len(data) >= MIN_COMPRESS_SIZE:
+                write_atomic(path + '.gz', gzip.compress(data, compresslevel=9, mtime=0))
+                compressed = _brotli_compress(data)
+                if compressed is not None:
+                    write_atomic(path + '.br', compressed)
+            write_atomic(path, data)
+        return target
+
+    def build(self):
+        """Fingerprint every asset and write the manifest"""
+        manifest = {source: self.build_asset(source) for source in self.sources()}
+        data = json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8')
+        try:
+            with open(self.manifest_path, 'rb') as f:
+                unchanged = f.read() == data
+        except OSError:
+            unchanged = False
+        if not unchanged:
+            # Left alone when nothing changed, so copies of static/ (export_static.py, rsync) stay incremental
+            write_atomic(self.manifest_path, data)
+        self._use(manifest)
+        return manifest
+
+    def load(self):
+        """Read the manifest written by a previous build, False if there is none"""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                self._use(json.load(f))
+        except (OSError, ValueError):
+            return False
+        return True
+
+    def clean(self):
+        """Remove fingerprinted files the current manifest no longer points at"""
+        keep = {os.path.join(self.static_folder, target) for target in self.manifest.values()}
+        keep |= {path + suffix for path in keep for suffix in ('.gz', '.br')}
+        keep.add(self.manifest_path)
+        removed = 0
+        for current, _, names in os.walk(self.output_folder):
+            for name in names:
+                path = os.path.join(current, name)
+                if path not in keep:
+                    os.remove(path)
+                    removed += 1
+        return removed
+
+    def resolve(self, filename):
+        """Fingerprinted path for a static filename, or filename itself when it has none"""
+        return self.manifest.get(filename, filename)
+
+    def _use(self, manifest):
+        self.manifest = manifest
+        self._fingerprinted = set(manifest.values())
+
+    def source_version(self, filename):
+        """Cache-buster of a source file - its modification time, None if it does not exist"""
+        try:
+            return int(os.path.getmtime(os.path.join(self.static_folder, filename)))
+        except OSError:
+            return None
+
+    def init_app(self, app, build=True, fingerprint=True):
+        """
+        Build (or load) the manifest, resolve url_for('static') through it and serve dist/ files
+        as immutable. fingerprint=False keeps the source URLs, cache-busted with ?v=.
+        """
+        try:
+            if build:
+                self.build()
+            else:
+                self.load()
+        except OSError as e:
+            print(f"⚠️  Static asset build failed, serving unfingerprinted files: {e}")
+
+        @app.url_defaults
+        def fingerprint_static_urls(endpoint, values):
+            if endpoint != 'static' or 'filename' not in values:
+                return
+            filename = values['filename']
+            if fingerprint and filename in self.manifest:
+                values['filename'] = self.manifest[filename]
+            elif 'v' not in values:
+                version = self.source_version(filename)
+                if version is not None:
+                    values['v'] = version
+
+        send_static_file = app.view_functions['static']
+
+        def static(filename):
+            if filename not in self._fingerprinted:
+                return send_static_file(filename=filename)
+            return self.send(filename)
+
+        app.view_functions['static'] = static
+
+    def send(self, filename):
+        """Response for a fingerprinted file - precompressed when the client accepts it"""
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        served, encoding = filename, None
+        for candidate, suffix in (('br', '.br'), ('gzip', '.gz')):
+            if candidate in request.accept_encodings and os.path.exists(os.path.join(self.static_folder, filename + suffix)):
+                served, encoding = filename + suffix, candidate
+                break
+
+        response = send_from_directory(self.static_folder, served, mimetype=mimetype)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        response.cache_control.public = True
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+        response.cache_control.no_cache = None
+        return response
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fingerprint, minify and precompress static assets')
+    parser.add_argument('--static', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static'),
+                        help='Static folder')
+    parser.add_argument('--clean', action='store_true', help='Remove outdated fingerprinted files after building (cached pages may still link to them)')
+    args = parser.parse_args()
+
+    pipeline = AssetPipeline(args.static)
+    manifest = pipeline.build()
+    for source, target in sorted(manifest.items()):
+        before = os.path.getsize(os.path.join(args.static, source))
+        after = os.path.getsize(os.path.join(args.static, target))
+        gz = os.path.join(args.static, target + '.gz')
+        compressed = f", gzip {os.path.getsize(gz) / 1024:.1f}KB" if os.path.exists(gz) else ''
+        print(f"{source:<40} -> {target}  {before / 1024:.1f}KB -> {after / 1024:.1f}KB{compressed}")
+    if args.clean:
+        print(f"🧹 Removed {pipeline.clean()} outdated files")
+    print(f"✅ Wrote {pipeline.manifest_path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
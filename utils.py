@@ -1,9 +1,16 @@
 """
 Utility functions for blog content processing
 """
+import html
+import os
 import re
+import tempfile
 from urllib.parse import urlparse, parse_qs
 
+from jinja2 import Environment
+from jinja2.filters import do_truncate
+from markupsafe import Markup
+
 def process_blog_content(content):
     """
     Process blog content - can add formatting, link processing, etc.
@@ -16,11 +23,65 @@ def process_blog_content(content):
     return content
 
 
+# Markers used by extract_searchable_content, compiled once.
+# A cut-off heading is the first <h2>-<h6> tag, as long as one of these phrases
+# appears after it with a closing heading tag somewhere after the phrase
+HEADING_START_PATTERN = re.compile(r'<h[2-6]', re.IGNORECASE)
+HEADING_CLOSE_PATTERN = re.compile(r'</h[2-6]>', re.IGNORECASE)
+FAQ_PHRASE_PATTERN = re.compile(
+    r'faq|frequently\s+asked|questions?\s+and\s+answer', re.IGNORECASE
+)
+LINK_SECTION_PHRASE_PATTERN = re.compile(
+    r'internal\s+link|related\s+articles|see\s+also', re.IGNORECASE
+)
+# Unheaded "Internal Linking Suggestions" blocks - the first form wins if both appear
+LINK_SUGGESTIONS_PATTERNS = [
+    re.compile(r'internal\s+linking\s+suggestions', re.IGNORECASE),
+    re.compile(r'internal\s+link\s+suggestions', re.IGNORECASE),
+]
+# Footer-like plain text, everything from the first one onwards is dropped
+FOOTER_PHRASE_PATTERN = re.compile(
+    r'anchor\s+texts?|target\s+slug|related\s+articles?|see\s+also', re.IGNORECASE
+)
+
+
+def _cut_before_link_suggestions(content):
+    for pattern in LINK_SUGGESTIONS_PATTERNS:
+        match = pattern.search(content)
+        if match:
+            return content[:match.start()]
+    return content
+
+
+def _strip_tags(html):
+    """Replace every <...> tag with a space in one left-to-right walk"""
+    pieces = []
+    position = search_from = 0
+    while True:
+        start = html.find('<', search_from)
+        if start == -1:
+            break
+        end = html.find('>', start + 1)
+        if end == -1:
+            break  # No tag can close anymore
+        if end == start + 1:
+            search_from = end  # "<>" is not a tag
+            continue
+        pieces.append(html[position:start])
+        pieces.append(' ')
+        position = search_from = end + 1
+    pieces.append(html[position:])
+    return ''.join(pieces)
+
+
 def extract_searchable_content(content):
     """
     Extract searchable content from post body, excluding FAQ sections and everything below them,
     internal linking sections, footer-like content, and other non-main content sections.
     
+    Every marker is located with one forward search, so the cost stays linear in the
+    size of the post instead of backtracking over it once per heading.
+    
     Args:
         content: Full HTML content of the post
         
@@ -30,58 +91,39 @@ def extract_searchable_content(content):
     if not content:
         return ""
     
-    # First, find and remove everything from FAQ section onwards
-    # FAQ sections typically start with headings like "FAQ", "Frequently Asked Questions", etc.
-    faq_patterns = [
-        r'(<h[2-6][^>]*>.*?[Ff][Aa][Qq].*?</h[2-6]>).*$',  # FAQ heading
-        r'(<h[2-6][^>]*>.*?[Ff]requently\s+[Aa]sked.*?</h[2-6]>).*$',  # Frequently Asked Questions
-        r'(<h[2-6][^>]*>.*?[Qq]uestions?\s+[Aa]nd\s+[Aa]nswers?.*?</h[2-6]>).*$',  # Questions and Answers
-    ]
+    # Locate the first heading tag - FAQ and internal linking sections cut from there
+    heading_start = heading_end = None
+    heading = HEADING_START_PATTERN.search(content)
+    if heading:
+        tag_end = content.find('>', heading.end())
+        if tag_end != -1:
+            heading_start, heading_end = heading.start(), tag_end + 1
     
-    cleaned_content = content
-    for pattern in faq_patterns:
-        match = re.search(pattern, cleaned_content, re.IGNORECASE | re.DOTALL)
-        if match:
-            # Remove everything from the FAQ heading onwards
-            cleaned_content = cleaned_content[:match.start()]
-            break
+    def followed_by_heading_section(phrase_pattern):
+        if heading_start is None:
+            return False
+        phrase = phrase_pattern.search(content, heading_end)
+        return phrase is not None and HEADING_CLOSE_PATTERN.search(content, phrase.end()) is not None
     
-    # Also remove sections that contain internal linking suggestions
-    # These usually appear at the end of AI-generated posts
-    internal_link_patterns = [
-        r'<h[2-6][^>]*>.*?[Ii]nternal\s+[Ll]inking.*?</h[2-6]>.*$',
-        r'<h[2-6][^>]*>.*?[Ii]nternal\s+[Ll]ink.*?</h[2-6]>.*$',
-        r'<h[2-6][^>]*>.*?[Rr]elated\s+[Aa]rticles.*?</h[2-6]>.*$',
-        r'<h[2-6][^>]*>.*?[Ss]ee\s+[Aa]lso.*?</h[2-6]>.*$',
-        r'[Ii]nternal\s+[Ll]inking\s+[Ss]uggestions.*$',
-        r'[Ii]nternal\s+[Ll]ink\s+[Ss]uggestions.*$',
-    ]
+    if followed_by_heading_section(FAQ_PHRASE_PATTERN):
+        # Remove everything from the FAQ heading onwards
+        cleaned_content = _cut_before_link_suggestions(content[:heading_start])
+    elif followed_by_heading_section(LINK_SECTION_PHRASE_PATTERN):
+        # Remove everything from the internal linking section onwards
+        cleaned_content = content[:heading_start]
+    else:
+        cleaned_content = _cut_before_link_suggestions(content)
     
-    for pattern in internal_link_patterns:
-        match = re.search(pattern, cleaned_content, re.IGNORECASE | re.DOTALL)
-        if match:
-            # Remove everything from the internal linking section onwards
-            cleaned_content = cleaned_content[:match.start()]
-            break
-    
-    # Remove HTML tags to get plain text
-    text = re.sub(r'<[^>]+>', ' ', cleaned_content)
+    # Remove HTML tags and decode character references (&amp;, &nbsp;) to get plain text
+    text = html.unescape(_strip_tags(cleaned_content))
     
     # Remove common footer-like patterns in plain text
-    text_patterns_to_remove = [
-        r'Anchor\s+texts?.*$',
-        r'Target\s+slug.*$',
-        r'Related\s+articles?.*$',
-        r'See\s+also.*$',
-    ]
-    
-    for pattern in text_patterns_to_remove:
-        text = re.sub(pattern, '', text, flags=re.IGNORECASE | re.DOTALL)
+    footer = FOOTER_PHRASE_PATTERN.search(text)
+    if footer:
+        text = text[:footer.start()]
     
     # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
-    
-    return text
+    return ' '.join(text.split())
 
 
 def extract_youtube_video_id(url):
@@ -211,3 +253,55 @@ def insert_youtube_video_in_content(content, youtube_url):
     
     # Fallback: If no second H2 or H3, insert at the end
     return content + video_html
+
+
+# Plain text kept for excerpts - longer than any truncate() the templates apply,
+# so truncating the stored text gives the same result as truncating the full text
+PLAIN_EXCERPT_LENGTH = 300
+SCHEMA_DESCRIPTION_LENGTH = 200
+FIRST_IMAGE_PATTERN = re.compile(r'src="([^"]+)"')
+
+_truncate_env = Environment()
+
+
+def build_render_artifacts(content, youtube_url=None):
+    """
+    Everything the templates derive from a post body, computed once when the post is saved.
+    
+    Returns a dict with:
+        rendered_content: processed body HTML with the YouTube embed inserted
+        plain_excerpt: start of the tag-free body text
+        first_image: src of the first image in the body, or None
+        schema_description: description used in the Article JSON-LD
+    """
+    processed = process_blog_content(content)
+    text = Markup(processed).striptags()
+    image = FIRST_IMAGE_PATTERN.search(processed)
+    return {
+        'rendered_content': insert_youtube_video_in_content(processed, youtube_url) if youtube_url else processed,
+        'plain_excerpt': text[:PLAIN_EXCERPT_LENGTH],
+        'first_image': image.group(1) if image else None,
+        'schema_description': do_truncate(_truncate_env, text, SCHEMA_DESCRIPTION_LENGTH),
+    }
+
+
+# Process umask, read once at import (os.umask can only be read by setting it)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def write_atomic(path, data):
+    """Write bytes to path through a temporary file and a rename, so readers see the old or the new file, never half of one"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        # mkstemp creates the file 0600 - give it the mode open() would, so a web server
+        # running as another user can read exported pages, static assets and prebuilt files
+        os.chmod(temp_path, 0o666 & ~_UMASK)
+        os.replace(temp_path, path)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise